@@ -0,0 +1,215 @@
+"""
+Job time estimation for whole move queues.
+Trapezoid plans are computed in closed form for a sweep of acceleration limits at once: with constant
+acceleration, squared speed reachable at a junction grows linearly with distance, so forward and backward
+look-ahead passes are prefix minimums of (junction limit - cumulative distance) over the (K, N) grid.
+S-curve estimates (when jerks are given) use lookahead.lookahead and profiler.plan_batch per setting.
+"""
+
+import copy
+import numpy as np
+import numpy.linalg as la
+from .geo3 import machine, MACHINE
+from .lookahead import junctionspeeds, lookahead
+from .profiler import PLANOK, plan_batch
+from .trapezioid import tplaner2_batch
+
+
+def _sweep(m: machine, accs, jerks):
+    """Machines of a parameter sweep: per axis limits of m replaced with each of accs / jerks."""
+    aa, jj = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(0 if accs is None else accs, float)),
+        np.atleast_1d(np.asarray(0 if jerks is None else jerks, float)),
+    )
+    res = []
+    for a, j in zip(aa.tolist(), jj.tolist()):
+        mm = copy.copy(m)
+        mm.accs = m.accs if accs is None else np.full(7, a)
+        mm.jerks = m.jerks if jerks is None else np.full(7, j)
+        res.append(mm)
+    return res
+
+
+def trapezoidtimes(l, a, v, vin, vout):
+    """Times of trapezoid plans (trapezioid.tplaner2_batch). Args are broadcasted.
+
+    Args:
+        l (ndarray): Distances to move, must be > 0
+        a (ndarray): Max accelerations
+        v (ndarray): Max speeds
+        vin (ndarray): Speeds at start points
+        vout (ndarray): Speeds at end points
+
+    Returns:
+        ndarray: Move times
+    """
+    return tplaner2_batch(l, v, a, vin, vout).sum(axis=-1)
+
+
+def movetimes(
+    moves: np.ndarray,
+    m: machine | None = None,
+    accs=None,
+    dev: float = 0.05,
+    vstart: float = 0,
+) -> np.ndarray:
+    """Times of trapezoid plans of moves with look-ahead (the queue ends at rest)
+    for a sweep of acceleration limits. Junction speeds are limited as in lookahead.junctionspeeds.
+
+    Args:
+        moves (ndarray): (N, 8) array of moves of format [XYZABCEF] as gparser.parse returns
+        m (machine, optional): Machine limits. Defaults to geo3.MACHINE.
+        accs (float | ndarray, optional): (K,) acceleration limits, each replaces per axis limits of m.
+            Defaults to None (limits of m).
+        dev (float, optional): Max distance from corner to the path passed at junction. Defaults to 0.05.
+        vstart (float, optional): Speed at start of the queue. Defaults to 0.
+
+    Returns:
+        ndarray: (K, N) array of move times, zero length moves take 0
+    """
+    if m is None:
+        m = MACHINE
+    moves = np.asarray(moves, float).reshape(-1, 8)
+    ls = la.norm(moves[:, :7], axis=1)
+    nz = ls > 0
+    l = ls[nz]
+    dirs = moves[nz, :7] / l[:, None]
+    if accs is None:
+        unit = m
+        scale = np.ones((1, 1), float)
+    else:
+        # Limits are linear in acceleration, so they are computed once for unit accelerations
+        unit = copy.copy(m)
+        unit.accs = np.ones(7, float)
+        scale = np.atleast_1d(np.asarray(accs, float))[:, None]
+    _, ma, mv = unit.limits(dirs)
+    feed = moves[nz, 7]
+    mv = np.where(feed > 0, np.minimum(mv, feed), mv)
+    vj = junctionspeeds(dirs, np.full(len(dirs), np.inf), unit, dev)
+    a = ma * scale  # (K, n)
+
+    # Squared speed limits at junctions
+    w = np.empty((len(scale), len(l) + 1), float)
+    w[:, 0] = vstart**2
+    w[:, 1:-1] = np.minimum(vj**2 * scale, np.minimum(mv[:-1], mv[1:]) ** 2)
+    w[:, -1] = 0
+    d = np.zeros_like(w)
+    np.cumsum(2 * a * l, axis=1, out=d[:, 1:])
+    w = np.minimum(w, d + np.minimum.accumulate(w - d, axis=1))  # Forward pass
+    w = np.minimum(w, np.minimum.accumulate((w + d)[:, ::-1], axis=1)[:, ::-1] - d)  # Backward pass
+    v = np.sqrt(np.maximum(w, 0))
+
+    res = np.zeros((len(scale), len(moves)), float)
+    res[:, nz] = trapezoidtimes(l, a, mv, v[:, :-1], v[:, 1:])
+    return res
+
+
+def scurvetimes(
+    moves: np.ndarray,
+    m: machine | None = None,
+    accs=None,
+    jerks=None,
+    dev: float = 0.05,
+    vstart: float = 0,
+) -> np.ndarray:
+    """Times of s-curve plans of moves with look-ahead (as lookahead.lookahead and profiler.plan_batch plan them)
+    for a sweep of acceleration and jerk limits. Moves plan_batch fails on take their movetimes time.
+
+    Args:
+        moves (ndarray): (N, 8) array of moves of format [XYZABCEF] as gparser.parse returns
+        m (machine, optional): Machine limits. Defaults to geo3.MACHINE.
+        accs (float | ndarray, optional): Acceleration limits, each replaces per axis limits of m. Defaults to None.
+        jerks (float | ndarray, optional): Jerk limits, broadcasted with accs. Defaults to None.
+        dev (float, optional): Max distance from corner to the path passed at junction. Defaults to 0.05.
+        vstart (float, optional): Speed at start of the queue. Defaults to 0.
+
+    Returns:
+        ndarray: (K, N) array of move times, zero length moves take 0
+    """
+    moves = np.asarray(moves, float).reshape(-1, 8)
+    ls = la.norm(moves[:, :7], axis=1)
+    nz = ls > 0
+    l = ls[nz]
+    dirs = moves[nz, :7] / l[:, None]
+    feed = moves[nz, 7]
+    ms = _sweep(MACHINE if m is None else m, accs, jerks)
+    res = np.zeros((len(ms), len(moves)), float)
+    for k, mm in enumerate(ms):
+        vin, vout = lookahead(moves, mm, dev, vstart)
+        mj, ma, mv = mm.limits(dirs)
+        mv = np.where(feed > 0, np.minimum(mv, feed), mv)
+        vin, vout = vin[nz], vout[nz]
+        ts, status = plan_batch(mj, ma, mv, l, vin, vout)
+        t = ts.sum(axis=1)
+        failed = status != PLANOK
+        if failed.any():
+            t[failed] = movetimes(moves, mm, dev=dev, vstart=vstart)[0, nz][failed]
+        res[k, nz] = t
+    return res
+
+
+def estimate(
+    moves: np.ndarray,
+    m: machine | None = None,
+    accs=None,
+    jerks=None,
+    dev: float = 0.05,
+    groups: np.ndarray | None = None,
+) -> np.ndarray:
+    """Estimates job time. Trapezoid plans are used if jerks are not given, else s-curve plans.
+
+    Args:
+        moves (ndarray): (N, 8) array of moves of format [XYZABCEF] as gparser.parse returns
+        m (machine, optional): Machine limits. Defaults to geo3.MACHINE.
+        accs (float | ndarray, optional): (K,) acceleration limits to sweep. Defaults to None (limits of m).
+        jerks (float | ndarray, optional): (K,) jerk limits to sweep. Defaults to None (trapezoid plans).
+        dev (float, optional): Max distance from corner to the path passed at junction. Defaults to 0.05.
+        groups (ndarray, optional): (N,) non negative int labels of moves (like layers or features return).
+            Defaults to None.
+
+    Returns:
+        ndarray: (K,) array of total times (s), or (K, G) array of times of each group if groups are given
+    """
+    if jerks is None:
+        times = movetimes(moves, m, accs, dev)
+    else:
+        times = scurvetimes(moves, m, accs, jerks, dev)
+    if groups is None:
+        return times.sum(axis=1)
+    groups = np.asarray(groups)
+    n = groups.max() + 1 if len(groups) else 0
+    return np.array([np.bincount(groups, t, minlength=n) for t in times])
+
+
+def layers(moves: np.ndarray, start: np.ndarray | None = None) -> np.ndarray:
+    """Layer labels of moves: index of Z height the move ends at, in order of increasing height.
+
+    Args:
+        moves (ndarray): (N, 7+) array of moves
+        start (ndarray, optional): Start position. Defaults to zeros.
+
+    Returns:
+        ndarray: (N,) int array of labels
+    """
+    z = np.cumsum(np.asarray(moves, float)[:, 2]) + (0 if start is None else start[2])
+    return np.unique(np.round(z, 6), return_inverse=True)[1].ravel()
+
+
+TRAVEL = 0  # Moves without extrusion
+EXTRUDE = 1  # Moves with extrusion
+RETRACT = 2  # Extruder only moves (retracts and primes)
+
+
+def features(moves: np.ndarray) -> np.ndarray:
+    """Feature labels of moves: TRAVEL, EXTRUDE or RETRACT.
+
+    Args:
+        moves (ndarray): (N, 7+) array of moves
+
+    Returns:
+        ndarray: (N,) int array of labels
+    """
+    moves = np.asarray(moves, float)
+    xyz = (moves[:, :6] != 0).any(axis=1)
+    e = moves[:, 6] != 0
+    return np.where(xyz, np.where(e, EXTRUDE, TRAVEL), np.where(e, RETRACT, TRAVEL))
@@ -1,7 +1,7 @@
 import numpy as np
 import numpy.linalg as la
 from math import acos, sin, tan, pi, sqrt, cos
-from pyquaternion import Quaternion
+from .rotation import rotate, rotation
 import matplotlib.pyplot as plt
 from numpy import ndarray
 
@@ -34,10 +34,9 @@ def fillet(v1, v2, p):
     v1t = v1 / la.norm(v1) * (la.norm(v1) - t)
     v2t = v2 / la.norm(v2) * (la.norm(v2) - t)
     n = np.cross(v1, v2)
-    q = Quaternion(axis=n, angle=(pi - a) / 2)
     c = t * sin(a / 2) * 2
     cv = v1 / la.norm(v1) * c
-    rv = q.rotate(cv)
+    rv = rotate(cv, n, (pi - a) / 2)
     return v1t, rv, v2t
 
 
@@ -57,16 +56,12 @@ def arcinterp(v1, v2, k=20):
     r = la.norm(v2) / 2 / cos(a / 2)
     n = np.cross(v1, v2)
     c = v1 / la.norm(v1) * r
-    q1 = Quaternion(axis=n, angle=pi / 2)
-    c = q1.rotate(c)
-    c3 = c
-    res = []
-    for i in np.linspace(0, 2 * b, k):
-        q2 = Quaternion(axis=n, angle=i)
-        c2 = q2.rotate(-c)
-        res.append(c3 + c2)
-        c3 = -c2
-    return res
+    rot = rotation(n)
+    c = rot(c, pi / 2)
+    c2 = rot(-c, np.linspace(0, 2 * b, k))  # Radius vectors from center to arc points
+    c2[1:] -= c2[:-1].copy()
+    c2[0] += c
+    return list(c2)
 
 
 def arcparam(v1, v2):
@@ -143,6 +138,102 @@ def fillet7d(v1: ndarray, v2: ndarray, p: float, maxa: float):
         return v1t7, (ad, ch7), v2t7
 
 
+_BIG = 1e300  # Infinite bound of clamped linear functions, finite to avoid 0 * inf
+
+
+def _compose(g, f):
+    """Composition g(f(x)) of clamped linear functions given as tuples of arrays (a, s, lo, hi):
+    x -> min(max(a + s * x, lo), hi)
+    """
+    a2, s2, lo2, hi2 = g
+    a1, s1, lo1, hi1 = f
+    b1 = a2 + s2 * lo1
+    b2 = a2 + s2 * hi1
+    lo = np.clip(np.minimum(b1, b2), lo2, hi2)
+    hi = np.clip(np.maximum(b1, b2), lo2, hi2)
+    return a2 + s2 * a1, s2 * s1, lo, hi
+
+
+def fillet_path(moves: ndarray, p: float, maxa: float) -> tuple[ndarray, ndarray]:
+    """Fillets all corners of a polyline at once. Result is the same as of applying fillet7d
+    to consecutive moves one by one, where trimmed output vector of a corner is the input of the next one,
+    so a move is trimmed not more than 0.5 of its length at the start and 0.9 of the rest at the end.
+    Arc chord bisects the corner, so it is found without rotations.
+
+    Args:
+        moves (ndarray): (N, 8) array of moves of format [XYZABCEF]
+        p (float): Distance from corner to arc (precision) in 3d space
+        maxa (float): Centripetal acceleration to calc max speed on arc
+
+    Returns:
+        tuple:
+            moves (ndarray): (M, 8) array of trimmed moves interleaved with arc chords of format [XYZABCEF]
+            sdirs (ndarray): (M, 3) array of arc start directions [XYZ], zeros for moves
+
+    rmk: Colinear, inverted and zero length (in 3d) moves are not filleted
+    """
+    if p <= 0:
+        raise ValueError(f"Precision must be >0, {p} given")
+    if maxa <= 0:
+        raise ValueError(f"Max acc must be >0, {maxa} given")
+    moves = np.asarray(moves, float).reshape(-1, 8)
+    n = len(moves)
+    if n < 2:
+        return moves.copy(), np.zeros((n, 3), float)
+    l = la.norm(moves[:, :3], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        u = moves[:, :7] / l[:, None]  # Per unit of 3d length
+        cos = (u[:-1, :3] * u[1:, :3]).sum(axis=1)
+        ok = (l[:-1] > 0) & (l[1:] > 0) & (np.abs(cos) != 1)
+        cos = np.clip(cos, -1, 1)
+        s = np.sqrt((1 + cos) / 2)  # Sine of half of corner inner angle
+        h = np.sqrt((1 - cos) / 2)  # Cosine of half of corner inner angle
+        tn = s / h  # Radius per trim length
+        c = np.where(ok, np.minimum(p * h / (1 - s), l[1:] / 2), 0)  # Trim by precision and output limit
+
+    # Input limit depends on trim of the previous corner: t[k] = min(c[k], 0.9 * (l[k] - t[k - 1])).
+    # Corners are clamped linear functions of the previous trim, so their chains are resolved with a prefix scan
+    t = np.minimum(c, 0.9 * l[:-1])
+    dep = c > 0.9 * (l[:-1] - np.r_[0, t[:-1]])
+    dep[0] = False
+    if dep.any():
+        chain = dep.copy()
+        chain[:-1] |= dep[1:]  # Chains start from an independent corner
+        idx = np.flatnonzero(chain)
+        d = dep[idx]
+        f = (
+            np.where(d, 0.9 * l[idx], t[idx]),
+            np.where(d, -0.9, 0.0),
+            np.full(len(idx), -_BIG),
+            np.where(d, c[idx], _BIG),
+        )
+        k = 1
+        while k < len(idx):
+            for x, y in zip(f, _compose([x[k:] for x in f], [x[:-k] for x in f])):
+                x[k:] = y
+            k *= 2
+        t[idx] = np.clip(f[0], f[2], f[3])
+
+    res = np.empty((2 * n - 1, 8), float)
+    sdirs = np.zeros((2 * n - 1, 3), float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.where(l > 0, (l - np.r_[0, t] - np.r_[t, 0]) / l, 1)
+    res[::2] = moves * scale[:, None]
+    res[::2, 7] = moves[:, 7]
+
+    ch = res[1::2]
+    with np.errstate(invalid="ignore"):
+        r = np.where(t > 0, t * tn, 0)  # Arc radius
+    ch[:, :6] = t[:, None] * (u[:-1, :6] + u[1:, :6])
+    ch[:, 6] = (u[:-1, 6] + u[1:, 6]) / 2 * np.arccos(cos) * r  # Preserving med extrusion per length
+    ch[:, 7] = np.minimum(np.sqrt(maxa * r), np.minimum(moves[:-1, 7], moves[1:, 7]))
+    sdirs[1::2] = u[:-1, :3]
+
+    keep = np.ones(2 * n - 1, bool)
+    keep[1::2] = t > 0
+    return res[keep], sdirs[keep]
+
+
 if __name__ == "__main__":
     pass
     # np.set_printoptions(precision=2, suppress=True)
@@ -4,7 +4,7 @@ import numpy as np
 import numpy.linalg as la
 from numbers import Number
 from math import acos, asin, pi
-from pyquaternion import Quaternion
+from .rotation import rotate
 
 
 class Point:
@@ -68,8 +68,7 @@ class Vector(Point):
         return Vector(self.val[:3] / la.norm(self.val[:3]))
 
     def rotate3d(self, v: "Vector", a: float) -> "Vector":
-        q = Quaternion(axis=v.val[:3], angle=a)
-        return Vector(list(q.rotate(self.val[:3])) + self.val[3:].tolist())
+        return Vector(rotate(self.val[:3], v.val[:3], a).tolist() + self.val[3:].tolist())
 
     def dot3d(self, v: "Vector") -> float:
         return np.dot(self.val[:3], v.val[:3])
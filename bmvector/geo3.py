@@ -2,10 +2,30 @@ import numpy as np
 from numpy import ndarray, dtype, floating
 import numpy.linalg as la
 import math
-from pyquaternion import Quaternion
 from numbers import Number
+from collections.abc import MutableSequence
 from typing import Self, Any, Iterable, Sequence
 from nptyping import NDArray, Shape, Float64, DType, Float
+from .rotation import rotate, rotation
+
+
+def arcdirbounds(s: ndarray, w: ndarray, angle: ndarray) -> ndarray:
+    """Max absolute direction components of arcs over their swept angles.
+    Direction at angle t is s cos(t) + w sin(t) = A cos(t - phi) per axis, so its max absolute value is
+    the amplitude A if t = phi (mod pi) is passed, else it is reached at one of the ends.
+
+    Args:
+        s (ndarray): (K, 3) unit start directions
+        w (ndarray): (K, 3) unit in-plane normals to start directions (axis x s)
+        angle (ndarray): (K,) arc angles
+
+    Returns:
+        ndarray: (K, 3) bounds
+    """
+    angle = angle[:, None]
+    peak = np.mod(np.arctan2(w, s), np.pi) <= angle
+    ends = np.maximum(np.abs(s), np.abs(s * np.cos(angle) + w * np.sin(angle)))
+    return np.where(peak, np.hypot(s, w), ends)
 
 
 class point(ndarray):
@@ -62,9 +82,22 @@ class point(ndarray):
 
 
 class vector(point):
+    def _cachekey(self) -> bytes:
+        return self.tobytes()
+
+    def _cached(self, name: str, func):
+        """Returns func() computed once and kept until the array is changed"""
+        key = self._cachekey()
+        cache = self.__dict__.get("_cache")
+        if cache is None or cache[0] != key:
+            cache = self._cache = (key, {})
+        if name not in cache[1]:
+            cache[1][name] = func()
+        return cache[1][name]
+
     @property
     def norm(self):
-        return la.norm(self)
+        return self._cached("norm", lambda: la.norm(self))
 
     def to3d(self, unit: bool = False) -> "vector":
         if not unit:
@@ -74,7 +107,7 @@ class vector(point):
 
     @property
     def len(self):
-        return la.norm(self[:3])
+        return self._cached("len", lambda: la.norm(self[:3]))
 
     def tounit(self) -> "vector":
         return self / self.norm
@@ -82,11 +115,13 @@ class vector(point):
     def dir(self, *args) -> "vector":
         return self.tounit()
 
+    def dirbounds(self) -> ndarray:
+        """Max absolute direction components over the move"""
+        return np.abs(self.tounit().asarray)
+
     def rotate(self, axis: "vector", angle: float) -> "vector":
-        q = Quaternion(axis=axis[:3], angle=angle)
-        rv = q.rotate(self[:3])
         r = vector(self)
-        r[:3] = rv
+        r[:3] = rotate(self.asarray[:3], axis.asarray[:3], angle)
         return r
 
     def dotv(self, v: "vector") -> float:
@@ -155,38 +190,81 @@ class arc(vector):
 
     @property
     def chordlen(self) -> float:
-        return self.chord.norm
+        return self._cached("chordlen", lambda: la.norm(self[:3]))
+
+    @property
+    def alpha(self) -> float:
+        """Angle between chord and start direction, half of arc angle"""
+        return self._cached("alpha", lambda: self.chord.angleto(self.sdir))
 
     @property
     def radius(self):
-        alpha = self.chord.angleto(self.sdir)
-        return abs(self.chord.norm / 2 / math.sin(alpha))
+        return self._cached("radius", lambda: abs(self.chordlen / 2 / math.sin(self.alpha)))
 
     @property
     def len(self):
-        return 2 * self.radius * self.chord.angleto(self.sdir)
+        return self._cached("len", lambda: 2 * self.radius * self.alpha)
 
     @property
     def norm(self):
-        return la.norm([self.len] + self[3:].tolist())
+        return self._cached("norm", lambda: la.norm([self.len] + self[3:].tolist()))
 
     @property
     def angle(self):
-        return 2 * self.chord.angleto(self.sdir)
+        return 2 * self.alpha
 
-    def dir(self, p: float) -> vector:
-        return self.sdir.rotate(
-            axis=self.sdir.cross(self), angle=self.angle * p
-        ).tounit()
+    def _cachekey(self) -> bytes:
+        return self.tobytes() + self.sdir.tobytes()
 
-    def eval(self, p: float) -> point:
-        ang = self.len * p / self.radius
-        axis = self.sdir.cross(self)
-        centr = self.sdir.to3d(unit=True).rotate(axis, math.pi / 2) * self.radius
-        rv = (centr * -1).rotate(axis, ang)
-        res = rv + centr
-        res[3:] = (self * p)[3:]
-        return point(res)
+    def _geom(self) -> tuple[float, rotation, ndarray, ndarray]:
+        """Angle, rotation about arc axis, unit start direction and center relative to start point"""
+        s = self.sdir.asarray[:3]
+        s = s / la.norm(s)
+        rot = rotation(np.cross(s, self.asarray[:3]))
+        centr = rot(s, math.pi / 2) * self.radius
+        return self.angle, rot, s, centr
+
+    def dir(self, p: float | ndarray) -> vector | ndarray:
+        """Direction at parameter p
+
+        Args:
+            p (float | ndarray): Parameter in [0, 1] or (K,) array of parameters
+
+        Returns:
+            vector | ndarray: Unit direction vector or (K, 7) array of directions
+        """
+        angle, rot, s, _ = self._cached("geom", self._geom)
+        p = np.asarray(p, float)
+        res = np.zeros(p.shape + (7,), float)
+        res[..., :3] = rot(s, angle * p)
+        if not p.ndim:
+            return vector(res)
+        return res
+
+    def dirbounds(self) -> ndarray:
+        """Max absolute direction components over the arc, see arcdirbounds"""
+        angle, rot, s, _ = self._cached("geom", self._geom)
+        r = np.zeros(7, float)
+        r[:3] = arcdirbounds(s[None], rot(s, math.pi / 2)[None], np.array((angle,)))[0]
+        return r
+
+    def eval(self, p: float | ndarray) -> point | ndarray:
+        """Point at parameter p relative to arc start
+
+        Args:
+            p (float | ndarray): Parameter in [0, 1] or (K,) array of parameters
+
+        Returns:
+            point | ndarray: Point or (K, 7) array of points
+        """
+        angle, rot, _, centr = self._cached("geom", self._geom)
+        p = np.asarray(p, float)
+        res = np.empty(p.shape + (7,), float)
+        res[..., :3] = rot(-centr, angle * p) + centr
+        res[..., 3:] = self.asarray[3:] * p[..., None]
+        if not p.ndim:
+            return point(res)
+        return res
 
     @staticmethod
     def fromttr(t1: vector, t2: vector, r=float) -> "arc":
@@ -246,29 +324,303 @@ class machine:
             (1000, 1000, 1000, 1000, 1000, 1000, 1000), float
         )  # mm/s or or deg/s^2 for each axis
 
+    def limits(self, dirs: ndarray) -> tuple[ndarray, ndarray, ndarray]:
+        """Projects per axis limits on movement directions.
+
+        Args:
+            dirs (ndarray): (N, 7) array of unit direction vectors
+
+        Returns:
+            tuple: (N,) arrays of effective jerk, acceleration and velocity limits
+        """
+        d = np.abs(dirs)
+        with np.errstate(divide="ignore"):
+            return (
+                (self.jerks / d).min(axis=-1),
+                (self.accs / d).min(axis=-1),
+                (self.speeds / d).min(axis=-1),
+            )
+
+    def pathlimits(self, p: "path") -> tuple[ndarray, ndarray, ndarray]:
+        """Effective limits of all segments of a path at once. Arc limits are exact worst cases
+        over the swept angle, arc speed is also limited with centripetal acceleration.
+
+        Args:
+            p (path): Path
+
+        Returns:
+            tuple: (N,) arrays of effective jerk, acceleration and velocity limits
+        """
+        mj, ma, mv = self.limits(p.dirbounds())
+        with np.errstate(invalid="ignore"):
+            mv = np.minimum(mv, np.sqrt(ma * p.radius))  # Radius is inf for vectors
+        return mj, ma, mv
+
+
+MACHINE = machine()  # Default machine shared by moves
+
+
+class path(MutableSequence):
+    """Sequence of vectors and arcs stored as struct of arrays: (N, 7) vectors (chords for arcs),
+    (N, 3) arc start directions (zeros for vectors) and (N,) feed rates.
+    Items are converted to vector / arc on access, whole path properties are computed as
+    numpy kernels over all segments and cached until the path is changed.
+    """
+
+    def __init__(
+        self,
+        vecs: ndarray | None = None,
+        sdirs: ndarray | None = None,
+        f: ndarray | None = None,
+    ):
+        vecs = np.zeros((0, 7), float) if vecs is None else np.array(vecs, float).reshape(-1, 7)
+        n = len(vecs)
+        self._n = n
+        self._vecs = vecs
+        self._sdirs = np.zeros((n, 3), float)
+        self._f = np.zeros(n, float)
+        if sdirs is not None:
+            sdirs = np.array(sdirs, float).reshape(n, 3)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ls = la.norm(sdirs, axis=1)
+                self._sdirs[:] = np.where(ls[:, None] > 0, sdirs / ls[:, None], 0)
+        if f is not None:
+            self._f[:] = f
+        self._cache = {}
+
+    @classmethod
+    def frommoves(cls, moves: ndarray) -> "path":
+        """Makes a path of linear moves from (N, 8) array of format [XYZABCEF] as gparser.load returns"""
+        moves = np.asarray(moves, float).reshape(-1, 8)
+        return cls(moves[:, :7], f=moves[:, 7])
+
+    @classmethod
+    def fromitems(cls, items: Iterable) -> "path":
+        """Makes a path from vectors, arcs or [XYZABCEF] arrays as gparser.parse returns.
+        Feed rate of arcs is taken from their f attribute.
+        """
+        r = cls()
+        for item in items:
+            r.append(item)
+        return r
+
+    @property
+    def vecs(self) -> ndarray:
+        return self._vecs[: self._n]
+
+    @property
+    def sdirs(self) -> ndarray:
+        return self._sdirs[: self._n]
+
+    @property
+    def f(self) -> ndarray:
+        return self._f[: self._n]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _item(self, item) -> tuple[ndarray, ndarray, float]:
+        sdir = np.zeros(3, float)
+        if type(item) == arc:
+            sdir = item.sdir.asarray[:3]
+        f = getattr(item, "f", 0)
+        item = np.asarray(item, float)
+        if len(item) > 7:
+            f = item[7]
+        return item[:7], sdir, f
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return path(self.vecs[i], self.sdirs[i], self.f[i])
+        i = range(self._n)[i]
+        if self._sdirs[i].any():
+            r = arc(self._vecs[i], sdir=self._sdirs[i])
+        else:
+            r = vector(self._vecs[i])
+        r.f = self._f[i]
+        return r
+
+    def __setitem__(self, i, item):
+        i = range(self._n)[i]
+        self._vecs[i], self._sdirs[i], self._f[i] = self._item(item)
+        self._cache.clear()
+
+    def __delitem__(self, i):
+        keep = np.ones(self._n, bool)
+        keep[i] = False
+        self._vecs = self.vecs[keep]
+        self._sdirs = self.sdirs[keep]
+        self._f = self.f[keep]
+        self._n = len(self._vecs)
+        self._cache.clear()
+
+    def insert(self, i: int, item):
+        i = min(max(i + self._n if i < 0 else i, 0), self._n)
+        if self._n == len(self._vecs):  # Arrays grow by doubling, so appends are amortized O(1)
+            cap = max(2 * self._n, 16)
+            for name, shape in (("_vecs", (cap, 7)), ("_sdirs", (cap, 3)), ("_f", (cap,))):
+                a = np.zeros(shape, float)
+                a[: self._n] = getattr(self, name)[: self._n]
+                setattr(self, name, a)
+        for a in (self._vecs, self._sdirs, self._f):
+            a[i + 1 : self._n + 1] = a[i : self._n].copy()
+        self._n += 1
+        self[i] = item
+
+    def _cached(self, name, func):
+        if name not in self._cache:
+            self._cache[name] = func()
+        return self._cache[name]
+
+    def _arcgeom(self):
+        """Half angles, radii and in-plane normals (axis x sdir) of arcs. For vectors are 0, inf and 0"""
+        ia = np.flatnonzero(self.isarc)
+        alpha = np.zeros(self._n, float)
+        r = np.full(self._n, np.inf)
+        w = np.zeros((self._n, 3), float)
+        c = self.vecs[ia, :3]
+        cl = la.norm(c, axis=1)
+        s = self.sdirs[ia]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            alpha[ia] = np.arccos(np.clip((c * s).sum(axis=1) / cl, -1, 1))
+            r[ia] = np.abs(cl / 2 / np.sin(alpha[ia]))
+            axis = np.cross(s, c)
+            axis /= la.norm(axis, axis=1)[:, None]
+        w[ia] = np.cross(axis, s)
+        return alpha, r, w
+
+    @property
+    def isarc(self) -> ndarray:
+        return self._cached("isarc", lambda: self.sdirs.any(axis=1))
+
+    @property
+    def angle(self) -> ndarray:
+        """(N,) arc angles, 0 for vectors"""
+        return 2 * self._cached("arcgeom", self._arcgeom)[0]
+
+    @property
+    def radius(self) -> ndarray:
+        """(N,) arc radii, inf for vectors"""
+        return self._cached("arcgeom", self._arcgeom)[1]
+
+    @property
+    def len(self) -> ndarray:
+        """(N,) XYZ lengths of segments, as vector.len and arc.len"""
+
+        def func():
+            with np.errstate(invalid="ignore"):
+                return np.where(
+                    self.isarc,
+                    self.radius * self.angle,
+                    la.norm(self.vecs[:, :3], axis=1),
+                )
+
+        return self._cached("len", func)
+
+    @property
+    def norm(self) -> ndarray:
+        """(N,) 7D lengths of segments, as vector.norm and arc.norm"""
+
+        def func():
+            return np.where(
+                self.isarc,
+                np.hypot(self.len, la.norm(self.vecs[:, 3:], axis=1)),
+                la.norm(self.vecs, axis=1),
+            )
+
+        return self._cached("norm", func)
+
+    def dir(self, p: float | ndarray = 0) -> ndarray:
+        """Directions of all segments at parameters p, as vector.dir and arc.dir
+
+        Args:
+            p (float | ndarray): Scalar or (N,) array of parameters in [0, 1]
+
+        Returns:
+            ndarray: (N, 7) array of unit directions
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = self.vecs / la.norm(self.vecs, axis=1)[:, None]
+        ia = np.flatnonzero(self.isarc)
+        if len(ia):
+            alpha, _, w = self._cached("arcgeom", self._arcgeom)
+            th = (2 * alpha[ia] * np.broadcast_to(p, (self._n,))[ia])[:, None]
+            r[ia] = 0
+            r[ia, :3] = self.sdirs[ia] * np.cos(th) + w[ia] * np.sin(th)
+        return r
+
+    def eval(self, p: float | ndarray = 1) -> ndarray:
+        """Points of all segments at parameters p relative to segment starts, as vector.eval and arc.eval
+
+        Args:
+            p (float | ndarray): Scalar or (N,) array of parameters in [0, 1]
+
+        Returns:
+            ndarray: (N, 7) array of points
+        """
+        p = np.broadcast_to(p, (self._n,))
+        r = self.vecs * p[:, None]
+        ia = np.flatnonzero(self.isarc)
+        if len(ia):
+            alpha, rad, w = self._cached("arcgeom", self._arcgeom)
+            th = (2 * alpha[ia] * p[ia])[:, None]
+            r[ia, :3] = rad[ia, None] * (self.sdirs[ia] * np.sin(th) + w[ia] * (1 - np.cos(th)))
+        return r
+
+    def dirbounds(self) -> ndarray:
+        """(N, 7) max absolute direction components of segments, for arcs over the whole swept angle"""
+        r = np.abs(self.dir(0))
+        ia = np.flatnonzero(self.isarc)
+        if len(ia):
+            alpha, _, w = self._cached("arcgeom", self._arcgeom)
+            r[ia, :3] = arcdirbounds(self.sdirs[ia], w[ia], 2 * alpha[ia])
+        return r
+
+    def fillet(self, p: float, maxa: float) -> "path":
+        """Fillets all corners of a path of vectors with fillet.fillet_path
+
+        Args:
+            p (float): Distance from corner to arc (precision) in 3d space
+            maxa (float): Centripetal acceleration to calc max speed on arc
+
+        Returns:
+            path: Path of trimmed vectors and arcs
+        """
+        from .fillet import fillet_path  # Imports matplotlib
+
+        if self.isarc.any():
+            raise ValueError("Only paths of vectors can be filleted")
+        moves, sdirs = fillet_path(np.c_[self.vecs, self.f], p, maxa)
+        return path(moves[:, :7], sdirs, moves[:, 7])
+
+    def points(self, start: ndarray | None = None) -> ndarray:
+        """(N + 1, 7) array of segment start points and the end point of the path"""
+        r = np.zeros((self._n + 1, 7), float)
+        if start is not None:
+            r[0] = start
+        np.cumsum(self.vecs, axis=0, out=r[1:])
+        r[1:] += r[0]
+        return r
+
 
 class move:
-    def __init__(self, va: vector | arc):
-        m = machine()
+    def __init__(self, va: vector | arc, m: machine | None = None):
+        """Move with effective limits of machine along its direction (for arcs worst case over the arc)
+
+        Args:
+            va (vector | arc): Movement vector or arc
+            m (machine, optional): Machine. Defaults to shared MACHINE.
+        """
         self.va = va
         self.times = np.zeros(7, float)
         self.vin = 0
         self.vout = 0
-        steps = 10 if type(va) == arc else 1
-        mj = np.zeros(steps, float)
-        ma = np.zeros(steps, float)
-        mv = np.zeros(steps, float)
-        with np.errstate(divide="ignore"):
-            for i, n in zip(np.linspace(0, 1, steps), range(steps)):
-                mj[n] = (m.jerks / va.dir(i).asarray).min()
-                ma[n] = (m.accs / va.dir(i).asarray).min()
-                mv[n] = (m.speeds / va.dir(i).asarray).min()
-        self.mj = mj.min()
-        self.ma = ma.min()
-        self.mv = mv.min()
+        mj, ma, mv = (m or MACHINE).limits(va.dirbounds())
+        self.mj = float(mj)
+        self.ma = float(ma)
+        self.mv = float(mv)
         if type(va) == arc:
-            r = va.radius
-            self.mv = min(self.mv, math.sqrt(self.ma * r))
+            self.mv = min(self.mv, math.sqrt(self.ma * va.radius))
 
     def plan(self, sv: float = 0, ev: float = 0):
         pass
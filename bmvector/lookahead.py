@@ -0,0 +1,135 @@
+"""
+Look-ahead planner: calculates entry and exit velocities of each move in a queue.
+Junction speeds are limited with the corner angle (like a fillet with given deviation from
+the corner is passed with centripetal acceleration), then forward and backward passes limit
+them to speeds reachable with s-curve ramps, so each move can be planned with profiler.plan6.
+Arcs (geo3.arc, as gparser.parse returns for G2/G3) are single moves of arc.len length,
+with limits of machine.pathlimits and their end directions at junctions.
+"""
+
+import numpy as np
+import numpy.linalg as la
+from .geo3 import arc, machine, MACHINE, path
+from .profiler import reachspeed
+
+
+def junctionspeeds(
+    dirs: np.ndarray, mv: np.ndarray, m: machine, dev: float, ends: np.ndarray | None = None
+) -> np.ndarray:
+    """Calculates max speeds at junctions between consecutive moves.
+
+    Args:
+        dirs (ndarray): (N, 7) array of unit direction vectors of moves (at start points for arcs)
+        mv (ndarray): (N,) array of max velocities of moves
+        m (machine): Machine limits
+        dev (float): Max distance from corner to the virtual fillet arc
+        ends (ndarray, optional): (N, 7) array of unit directions at end points. Defaults to None (dirs).
+
+    Returns:
+        ndarray: (N-1,) array of junction speeds
+    """
+    u1 = (dirs if ends is None else ends)[:-1]
+    u2 = dirs[1:]
+    c = np.clip((u1 * u2).sum(axis=1), -1, 1)
+    s = np.sqrt((1 + c) / 2)  # Sine of half of corner inner angle
+    du = u2 - u1
+    dl = la.norm(du, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = dev * s / (1 - s)  # Radius of fillet as in fillet.fillet
+        # Acc limit along unit direction of speed change, straight junctions aren't limited
+        ac = np.where(dl > 0, (m.accs / np.abs(du / dl[:, None])).min(axis=1), np.inf)
+        vj = np.sqrt(ac * r)
+    return np.minimum(vj, np.minimum(mv[:-1], mv[1:]))
+
+
+def _topath(moves) -> path:
+    """Path of (N, 8) moves array, geo3.path or sequence of items as gparser.parse returns"""
+    if isinstance(moves, path):
+        return moves
+    if isinstance(moves, np.ndarray) or not any(isinstance(x, arc) for x in moves):
+        return path.frommoves(moves)
+    return path.fromitems(moves)
+
+
+def lookahead(
+    moves,
+    m: machine | None = None,
+    dev: float = 0.05,
+    vstart: float = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Calculates entry and exit velocities of moves. The queue ends at rest.
+    Zero length moves (like feed rate changes) keep the speed of the point they are at.
+
+    Args:
+        moves (ndarray | path | Sequence): (N, 8) array of moves of format [XYZABCEF] as gparser.load returns,
+            geo3.path, or sequence of [XYZABCEF] arrays and arcs as gparser.parse returns
+        m (machine, optional): Machine limits. Defaults to geo3.MACHINE.
+        dev (float, optional): Max distance from corner to the path passed at junction. Defaults to 0.05.
+        vstart (float, optional): Speed at start of the queue. Defaults to 0.
+
+    Returns:
+        tuple:
+            vin (ndarray): (N,) array of speeds at start points
+            vout (ndarray): (N,) array of speeds at end points
+    """
+    if m is None:
+        m = MACHINE
+    p = _topath(moves)
+    ls = np.where(p.isarc, p.len, p.norm)
+    nz = ls > 0
+    if not nz.all():
+        p = path(p.vecs[nz], p.sdirs[nz], p.f[nz])
+    mj, ma, mv = m.pathlimits(p)
+    feed = p.f
+    mv = np.where(feed > 0, np.minimum(mv, feed), mv)
+
+    w = np.zeros(len(p) + 1, float)
+    w[0] = vstart
+    w[1:-1] = junctionspeeds(p.dir(0), mv, m, dev, p.dir(1) if p.isarc.any() else None)
+
+    wl = w.tolist()
+    args = list(zip(ls[nz].tolist(), mj.tolist(), ma.tolist()))
+    for k, (l, j, a) in enumerate(args):
+        if wl[k + 1] > wl[k]:
+            wl[k + 1] = min(wl[k + 1], reachspeed(wl[k], l, j, a))
+    for k in range(len(args) - 1, -1, -1):
+        if wl[k] > wl[k + 1]:
+            l, j, a = args[k]
+            wl[k] = min(wl[k], reachspeed(wl[k + 1], l, j, a))
+    w = np.array(wl, float)
+
+    idx = np.cumsum(nz)
+    return w[idx - nz], w[idx]
+
+
+def iterlookahead(moves, window: int = 1000, m: machine | None = None, dev: float = 0.05):
+    """Streaming version of lookahead. Takes any iterable of moves and arcs (like gparser.iterparse)
+    and keeps not more than window moves in memory.
+    Buffered moves are planned as if the machine stops at the end of the buffer, and the first half
+    of them is yielded. Appending moves to the buffer only rises speeds it allows,
+    so yielded speeds are always feasible.
+
+    Args:
+        moves (Iterable[ndarray | arc]): Moves of format [XYZABCEF] and arcs
+        window (int, optional): Look-ahead window size (moves). Defaults to 1000.
+        m (machine, optional): Machine limits. Defaults to geo3.MACHINE.
+        dev (float, optional): Max distance from corner to the path passed at junction. Defaults to 0.05.
+
+    Yields:
+        tuple: move, vin, vout
+    """
+    if window < 2:
+        raise ValueError(f"Window must be at least 2 moves, {window} given")
+    buf = []
+    vstart = 0
+    for move in moves:
+        buf.append(move)
+        if len(buf) == window:
+            vin, vout = lookahead(buf, m, dev, vstart)
+            n = window // 2
+            yield from zip(buf[:n], vin[:n].tolist(), vout[:n].tolist())
+            vstart = vout[n - 1]
+            del buf[:n]
+    if buf:
+        vin, vout = lookahead(buf, m, dev, vstart)
+        yield from zip(buf, vin.tolist(), vout.tolist())
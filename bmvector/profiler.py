@@ -6,8 +6,115 @@ inspired by https://github.com/max-bold/wallplotter/blob/main/profiler.py
 
 # from typing import Generator
 # from math import copysign
+import os
+from collections import OrderedDict
 import numpy as np
-from math import sqrt
+from math import sqrt, cbrt
+from time import perf_counter
+from .trapezioid import tplaner2
+
+# Solvers backend: "python" or "numba". Can be overridden per call with backend= argument.
+BACKEND = os.environ.get("BMVECTOR_BACKEND", "python")
+
+
+def getjit(backend: str | None = None):
+    """Returns profilerjit module if numba backend is selected and numba is installed, else None.
+
+    Args:
+        backend (str, optional): "python" or "numba". Defaults to BACKEND.
+
+    Raises:
+        ValueError: If backend is unknown
+    """
+    backend = backend or BACKEND
+    if backend == "python":
+        return None
+    if backend == "numba":
+        from . import profilerjit
+
+        return profilerjit if profilerjit.available else None
+    raise ValueError(f"Unknown backend {backend!r}, 'python' or 'numba' expected")
+
+
+class solvestats:
+    """Instrumentation of iterative solvers (plan3, plan4, plan5, calcspeedramp, alignspeed).
+    While a solvestats is active (in a with block), each solve records loop iterations, step halvings,
+    integratetolist calls and elapsed time, totals are aggregated per solver.
+    Solvers only check that STATS is None when disabled. Time of a solver includes nested solvers
+    (like calcspeedramp in plan5), failed solves (raised errors) and solves of the numba backend are not recorded.
+    """
+
+    FIELDS = ("solves", "iterations", "halvings", "integrations", "time")
+
+    def __init__(self, keep: bool = False):
+        """
+        Args:
+            keep (bool, optional): Also keep a record of each solve (see records). Defaults to False.
+        """
+        self.totals = {}  # Solver name: list of FIELDS totals
+        self.keep = keep
+        self._records = []
+        self._prev = None
+
+    def record(self, solver, tp, vin, vout, iterations, halvings, integrations, t0):
+        t = perf_counter() - t0
+        tot = self.totals.get(solver)
+        if tot is None:
+            tot = self.totals[solver] = [0, 0, 0, 0, 0.0]
+        tot[0] += 1
+        tot[1] += iterations
+        tot[2] += halvings
+        tot[3] += integrations
+        tot[4] += t
+        if self.keep:
+            self._records.append((solver, tp, vin, vout, iterations, halvings, integrations, t))
+
+    def merge(self, other: "solvestats") -> "solvestats":
+        """Adds totals and records of other stats (like of another job or process)"""
+        for solver, tot in other.totals.items():
+            mine = self.totals.setdefault(solver, [0, 0, 0, 0, 0.0])
+            for i, x in enumerate(tot):
+                mine[i] += x
+        self._records += other._records
+        return self
+
+    def summary(self) -> dict:
+        """Totals and means per solve of each solver"""
+        res = {}
+        for solver, tot in self.totals.items():
+            d = dict(zip(self.FIELDS, tot))
+            d.update({f"mean {f}": x / tot[0] for f, x in zip(self.FIELDS[1:], tot[1:])})
+            res[solver] = d
+        return res
+
+    def records(self) -> np.ndarray:
+        """Kept records as structured array with fields solver, tp, vin, vout, iterations, halvings,
+        integrations, time. Sort by time to find move geometries that dominate planning time.
+        """
+        dtype = [
+            ("solver", "U16"),
+            ("tp", float),
+            ("vin", float),
+            ("vout", float),
+            ("iterations", np.int64),
+            ("halvings", np.int64),
+            ("integrations", np.int64),
+            ("time", float),
+        ]
+        return np.array(self._records, dtype)
+
+    def __enter__(self):
+        global STATS
+        self._prev = STATS
+        STATS = self
+        return self
+
+    def __exit__(self, *exc):
+        global STATS
+        STATS = self._prev
+
+
+STATS: solvestats | None = None  # Active solvestats, None disables instrumentation
 
 # from numbers import Number, Real
 
@@ -43,12 +150,32 @@ def integrateseq(
     return a, v, p
 
 
-def integratetolist(ts, js, vin):
-    res = np.zeros((8, 3), float)
-    res[0] = [0, vin, 0]
-    for i in range(7):
-        res[i + 1] = integrate(ts[i], js[i], *res[i])
-    return res
+def integratetolist(ts, js, vin, out=None):
+    """Integrates time list and returns (a, v, p) at each of 8 segment boundaries.
+    Integration is done on plain floats, so no arrays are allocated if out buffer is given.
+
+    Args:
+        ts (ndarray | Sequence[float]): List of 7 time intervals
+        js (ndarray | Sequence[float]): List of 7 jerk values
+        vin (float): Speed at start point
+        out (ndarray, optional): Contiguous (8, 3) float array to write results to. Defaults to None (new array).
+
+    Returns:
+        ndarray: (8, 3) array of a, v, p at segment boundaries
+    """
+    if out is None:
+        out = np.empty((8, 3), float)
+    a = 0.0
+    v = float(vin)
+    p = 0.0
+    res = [a, v, p]
+    for t, j in zip(np.asarray(ts, float).tolist(), np.asarray(js, float).tolist()):
+        p = j * t**3 / 6 + a * t**2 / 2 + v * t + p
+        v = j * t**2 / 2 + a * t + v
+        a = j * t + a
+        res += a, v, p
+    out.reshape(24)[:] = res
+    return out
 
 
 # def calcerrors(
@@ -310,7 +437,7 @@ def plan2(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
                 else:
                     s = maxv / maxa / 1000
                     ts[1] += s
-                avps = integratetolist(ts, js, vin)
+                integratetolist(ts, js, vin, avps)
             if avps[7, 1] > vout:
                 if -avps[5, 0] < maxa:
                     s = maxa / j / 1000
@@ -319,13 +446,13 @@ def plan2(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
                 else:
                     s = maxv / maxa / 1000
                     ts[5] += s
-                avps = integratetolist(ts, js, vin)
+                integratetolist(ts, js, vin, avps)
         else:
             s = tp / maxv / 1000
             if tp - avps[7, 2] < 10 * maxv * s:
                 s = s / 10
             ts[3] += s
-            avps = integratetolist(ts, js, vin)
+            integratetolist(ts, js, vin, avps)
     return ts
 
 
@@ -339,13 +466,34 @@ class NoconvergenceError(Exception):
         super().__init__(*args)
 
 
-def alignspeed(ts, js, vin, vout, maxa, maxv, tvp, s):
+def alignspeed(ts, js, vin, vout, maxa, maxv, tvp, s, backend=None):
+    t0 = perf_counter() if STATS is not None else 0.0
+    it = h = 0
     avps = integratetolist(ts, js, vin)
+    jit = getjit(backend)
+    if jit:
+        status = jit.alignspeed(
+            ts.view(np.ndarray),
+            js,
+            float(vin),
+            float(vout),
+            float(maxa),
+            float(maxv),
+            float(tvp),
+            float(s),
+            avps,
+            isinstance(ts, times),
+        )
+        if status == jit.NOCONVERGENCE:
+            raise NoconvergenceError(f"Failed to align speed for")
+        return ts
     up = None
     while abs(avps[7, 1] - vout) > tvp:
+        it += 1
         if avps[7, 1] < vout:
             if up == False:
                 s /= 2
+                h += 1
             up = True
             if ts[5] > 0:
                 ts[5] = max(ts[5] - s, 0)
@@ -360,19 +508,24 @@ def alignspeed(ts, js, vin, vout, maxa, maxv, tvp, s):
         if avps[7, 1] > vout:
             if up == True:
                 s /= 2
+                h += 1
             up = False
             if -avps[5, 0] < maxa:
                 ts[4] += s
                 ts[6] = ts[4]
             else:
                 ts[5] += s
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
         if s == 0:
             raise NoconvergenceError(f"Failed to align speed for")
+    if STATS is not None:
+        STATS.record("alignspeed", float("nan"), vin, vout, it, h, 1 + it, t0)
     return ts
 
 
 def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
+    t0 = perf_counter() if STATS is not None else 0.0
+    it = h = 0
 
     tpp = 1 / 1000
     tvp = 1 / 1000
@@ -389,9 +542,11 @@ def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
     up = None
 
     while abs(avps[7, 1] - vout) > tvp:
+        it += 1
         if avps[7, 1] < vout:
             if up == False:
                 s /= 2
+                h += 1
             up = True
             if ts[5] > 0:
                 ts[5] = max(ts[5] - s, 0)
@@ -409,6 +564,7 @@ def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
         elif avps[7, 1] > vout:
             if up == True:
                 s /= 2
+                h += 1
             up = False
             if ts[1] > 0:
                 ts[1] = max(ts[1] - s, 0)
@@ -423,7 +579,7 @@ def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
                     ts[5] += min(s, (vout - avps[7, 1]) / ts[3] / j)
                 else:
                     ts[5] += s
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
 
         if s == 0:
             raise NoconvergenceError(
@@ -439,9 +595,11 @@ def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
     up = None
 
     while abs(avps[7, 2] - tp) > tpp:
+        it += 1
         if avps[7, 2] < tp:
             if up == False:
                 s /= 2
+                h += 1
             up = True
             if avps[1, 0] < maxa and -avps[5, 0] < maxa:
                 ts[0] += min(s, (maxa - avps[1, 0]) / j)
@@ -456,6 +614,7 @@ def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
         if avps[7, 2] > tp:
             if up == True:
                 s /= 2
+                h += 1
             up = False
             if ts[3] > 0:
                 ts[3] = max(ts[3] - s, 0)
@@ -468,24 +627,46 @@ def plan3(j, maxa, maxv, tp, vin=0, vout=0, cb=None):
                 ts[4] = max(ts[4] - ss, 0)
                 ts[6] = ts[4]
         ts = alignspeed(ts, js, vin, vout, maxa, maxv, tvp, s)
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
         if s == 0:
             raise NoconvergenceError("Failed to adjust path length")
 
+    if STATS is not None:
+        STATS.record("plan3", tp, vin, vout, it, h, 1 + it, t0)
     return ts
 
 
-def calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp):
+def calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp, backend=None):
+    t0 = perf_counter() if STATS is not None else 0.0
+    it = h = 0
 
     avps = integratetolist(ts, js, vin)
+    jit = getjit(backend)
+    if jit:
+        # Compiled kernel leaves ts and avps converged, so the loop below is skipped
+        jit.calcspeedramp(
+            ts.view(np.ndarray),
+            js,
+            float(vin),
+            float(vout),
+            float(maxa),
+            float(maxv),
+            float(tp),
+            float(tvp),
+            float(tpp),
+            avps,
+            isinstance(ts, times),
+        )
 
     s = 1 / 100
     up = None
 
     while abs(avps[7, 1] - vout) > tvp:
+        it += 1
         if avps[7, 1] < vout:
             if up == False:
                 s /= 2
+                h += 1
             up = True
             if ts[5] > 0:
                 ts[5] = max(ts[5] - s, 0)
@@ -503,6 +684,7 @@ def calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp):
         elif avps[7, 1] > vout:
             if up == True:
                 s /= 2
+                h += 1
             up = False
             if ts[1] > 0:
                 ts[1] = max(ts[1] - s, 0)
@@ -517,7 +699,7 @@ def calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp):
                     ts[5] += min(s, (vout - avps[7, 1]) / ts[3] / js[0])
                 else:
                     ts[5] += s
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
 
         # if s < 1e-10:
         #     raise NoconvergenceError(
@@ -529,10 +711,14 @@ def calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp):
             f"Path {tp=:.3f} is to short. To ramp from {vin=:.3f} to {vout=:.3f} with given j={js[0]:.0f} and {maxa=:.0f} it should be not shorter than {avps[7,2]:.3f}"
         )
 
+    if STATS is not None and not jit:
+        STATS.record("calcspeedramp", tp, vin, vout, it, h, 1 + it, t0)
     return ts
 
 
 def plan4(j, maxa, maxv, tp, vin=0, vout=0):
+    t0 = perf_counter() if STATS is not None else 0.0
+    it = h = 0
 
     tpp = 1 / 1000
     tvp = 1 / 1000
@@ -551,9 +737,11 @@ def plan4(j, maxa, maxv, tp, vin=0, vout=0):
     up = None
 
     while abs(avps[7, 2] - tp) > tpp:
+        it += 1
         if avps[7, 2] < tp:
             if up == False:
                 s /= 2
+                h += 1
             up = True
             if avps[1, 0] < maxa - tvp and avps[3, 1] < maxv - tvp:
                 sss = (
@@ -605,6 +793,7 @@ def plan4(j, maxa, maxv, tp, vin=0, vout=0):
         if avps[7, 2] > tp:
             if up == True:
                 s /= 2
+                h += 1
             up = False
             if ts[3] > 0:
                 ts[3] = max(ts[3] - s, 0)
@@ -648,10 +837,12 @@ def plan4(j, maxa, maxv, tp, vin=0, vout=0):
                 ts[2] = ts[0]
 
         # ts = alignspeed(ts, js, vin, vout, maxa, maxv, tvp, s)
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
         if s == 0:
             raise NoconvergenceError("Failed to adjust path length")
 
+    if STATS is not None:
+        STATS.record("plan4", tp, vin, vout, it, h, 1 + it, t0)
     return ts
 
 
@@ -694,7 +885,7 @@ def calcspeedramp2(j, vin, vout, maxa, maxv, tp, tvp, tpp):
                     ts[5] += min(s, (vout - avps[7, 1]) / ts[3] / js[0])
                 else:
                     ts[5] += s
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
 
         if s == 0:
             raise NoconvergenceError(
@@ -725,7 +916,53 @@ class times(np.ndarray):
             super().__setitem__(key, value)
 
 
-def plan5(j, maxa, maxv, tp, vin=0, vout=0):
+def trapezoidguess(j, maxa, maxv, tp, vin=0, vout=0) -> np.ndarray:
+    """Initial guess of plan5 from the trapezoid plan (trapezioid.tplaner2).
+    S-curve ramps take longer paths than trapezoid ones, so the trapezoid peak speed is an upper bound
+    of the s-curve one. If s-curve ramps to it don't fit, peak speed is refined with peakspeed
+    bracketed by it, else the rest of the path is passed at it.
+
+    Returns:
+        ndarray: List of 7 time intervals
+    """
+    vlo = max(vin, vout)
+    vp = min(max(vin + maxa * tplaner2(tp, maxv, maxa, vin, vout)[0], vlo), maxv)
+    pr = rampdist(vin, vp, j, maxa) + rampdist(vp, vout, j, maxa)
+    if pr <= tp:
+        tc = (tp - pr) / vp if vp > 0 else 0.0
+    else:
+        with np.errstate(divide="ignore"):  # Ramp derivative is inf at zero speed change
+            vp = peakspeed(j, maxa, vp, tp, vin, vout, tp * 1e-12) if vp > vlo else vlo
+        tc = 0.0
+    tj1, ta1 = ramptimes(vp - vin, j, maxa)
+    tj2, ta2 = ramptimes(vp - vout, j, maxa)
+    return np.array((tj1, max(ta1, 0), tj1, tc, tj2, max(ta2, 0), tj2), float)
+
+
+def plan5(j, maxa, maxv, tp, vin=0, vout=0, backend=None, init="trapezoid"):
+    """Calculates movement plan by iterating over time intervals.
+
+    Args:
+        j (float): max jerk
+        maxa (float): max acceleration
+        maxv (float): max velocity
+        tp (float): Distance to move
+        vin (float, optional): Speed at start point. Defaults to 0.
+        vout (float, optional): Speed at end point. Defaults to 0.
+        backend (str, optional): Solvers backend, see getjit. Defaults to BACKEND.
+        init (str | ndarray, optional): Start point of iterations: "trapezoid" (trapezoidguess),
+            "zeros" (speed ramp from zero intervals) or a list of 7 time intervals
+            (like a plan of a previous similar move). Defaults to "trapezoid".
+
+    Raises:
+        ValueError: If vin or vout is greater then maxv
+        PathtoshortError: If path is to short to ramp from vin to vout
+
+    Returns:
+        ndarray: List of 7 time intervals
+    """
+    t0 = perf_counter() if STATS is not None else 0.0
+    h = 0
 
     tpp = 1 / 1000
     tvp = 1 / 100
@@ -737,9 +974,38 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
     js = np.array((1, 0, -1, 0, -1, 0, 1), float) * j
     ts = times()
 
-    ts = calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp)
+    if isinstance(init, str) and init == "zeros":
+        ts = calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp, backend)
+    else:
+        vlo = max(vin, vout)
+        pmin = rampdist(vin, vlo, j, maxa) + rampdist(vlo, vout, j, maxa)
+        if pmin > tp + tpp:
+            raise PathtoshortError(
+                f"Path {tp=:.3f} is to short. To ramp from {vin=:.3f} to {vout=:.3f} with given {j=:.0f} and {maxa=:.0f} it should be not shorter than {pmin:.3f}"
+            )
+        if isinstance(init, str):
+            if init != "trapezoid":
+                raise ValueError(f"Unknown init {init!r}, 'trapezoid', 'zeros' or time intervals expected")
+            init = trapezoidguess(j, maxa, maxv, tp, vin, vout)
+        ts.view(np.ndarray)[:] = np.maximum(init, 0)
 
     avps = integratetolist(ts, js, vin)
+    jit = getjit(backend)
+    if jit:
+        # Compiled kernel leaves ts and avps converged, so the loop below is skipped
+        jit.plan5(
+            ts.view(np.ndarray),
+            js,
+            float(j),
+            float(maxa),
+            float(maxv),
+            float(tp),
+            float(vin),
+            float(vout),
+            tvp,
+            tpp,
+            avps,
+        )
     s = 1 / 100
     up = None
     n = 0
@@ -753,6 +1019,7 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
             if avps[7, 1] > vout+tvp:
                 if upp == False:
                     ss /= 2
+                    h += 1
                 upp = True
                 if avps[7, 2] <= tp:
                     tj = maxa / j
@@ -763,6 +1030,7 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
                 if avps[7, 2] > tp:
                     if up == True:
                         s /= 2
+                        h += 1
                     up = False
                     if ts[1] > 0:
                         ts[1] -= ss
@@ -771,6 +1039,7 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
             if avps[7, 1] < vout-tvp:
                 if upp == True:
                     ss /= 2
+                    h += 1
                 upp = False
                 if ts[5] > 0:
                     ts[5] -= ss
@@ -779,23 +1048,24 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
                 else:
                     if up == False:
                         s /= 2
+                        h += 1
                     up = True
                     tj = min(maxa / j, sqrt((maxv - vin) / j))
                     if ts[0] < tj:
                         ts[0] = min(ts[0] + s, tj)
                     else:
-                        ta = (maxv - vin) / (j * ts[0]) - ts[0]
+                        ta = (maxv - vin) / (j * ts[0]) - ts[0] if ts[0] else 0.0
                         ts[1] = min(ts[1] + s, ta)
-            avps = integratetolist(ts, js, vin)
+            integratetolist(ts, js, vin, avps)
             pass
 
         if avps[7, 2] < tp-tpp:
             if up == False:
                 s /= 2
+                h += 1
             up = True
             tj = min(maxa / j, sqrt((maxv - vin) / j))
-            if ts[0]:
-                ta = (maxv - vin) / (j * ts[0]) - ts[0]
+            ta = (maxv - vin) / (j * ts[0]) - ts[0] if ts[0] else 0.0
             if ts[0] < tj:
                 ts[0] = min(ts[0] + s, tj)
             elif ts[1] < ta:
@@ -806,6 +1076,7 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
         if avps[7, 2] > tp+tpp:
             if up == True:
                 s /= 2
+                h += 1
             up = False
             if ts[3] > 0:
                 # ts[3] = max(ts[3] - s, 0)
@@ -814,8 +1085,382 @@ def plan5(j, maxa, maxv, tp, vin=0, vout=0):
                 ts[1] -= s
             else:
                 ts[0] -= s
-        avps = integratetolist(ts, js, vin)
+        integratetolist(ts, js, vin, avps)
         pass
         # if s < 1e-10:
         #     raise NoconvergenceError("Couldn't find convergence")
+    if STATS is not None and not jit:
+        STATS.record("plan5", tp, vin, vout, n + nn, h, 1 + n + nn, t0)
     return ts
+
+
+def ramptimes(dv: float, j: float, maxa: float) -> tuple[float, float]:
+    """Calculates jerk and constant acceleration times of a symmetric speed ramp.
+
+    Args:
+        dv (float): Speed change, must be >= 0
+        j (float): max jerk
+        maxa (float): max acceleration
+
+    Returns:
+        tuple[float, float]:
+            tj: time of each of two jerk segments
+            ta: time of constant acceleration segment
+    """
+    if dv * j >= maxa**2:
+        return maxa / j, dv / maxa - maxa / j
+    return sqrt(dv / j), 0.0
+
+
+def rampdist(v0: float, v1: float, j: float, maxa: float) -> float:
+    """Returns a distance passed while ramping speed from v0 to v1.
+    Acceleration of symmetric ramp is symmetric too, so mean speed is (v0+v1)/2.
+    """
+    tj, ta = ramptimes(abs(v1 - v0), j, maxa)
+    return (v0 + v1) / 2 * (2 * tj + ta)
+
+
+def rampdistdv(v0: float, v1: float, j: float, maxa: float) -> float:
+    """Returns a derivative of rampdist by v1 (v1 > v0)"""
+    dv = v1 - v0
+    if dv * j >= maxa**2:
+        return v1 / maxa + maxa / j / 2
+    return sqrt(dv / j) + (v0 + v1) / 2 / sqrt(dv * j)
+
+
+def reachspeed(v0: float, p: float, j: float, maxa: float) -> float:
+    """Returns max speed that can be reached ramping from v0 on distance p. Inverse of rampdist.
+
+    Args:
+        v0 (float): Speed at start point
+        p (float): Distance
+        j (float): max jerk
+        maxa (float): max acceleration
+
+    Returns:
+        float: speed at end point
+    """
+    if p <= 0:
+        return v0
+    b = maxa**2 / j
+    if p >= (2 * v0 + b) * maxa / j:
+        return (sqrt(b**2 - 4 * (v0 * b - v0**2 - 2 * maxa * p)) - b) / 2
+    # Ramp doesn't reach maxa: (v1 + v0)**2 * (v1 - v0) = p**2 * j, solved by Cardano formula
+    q = 16 * v0**3 / 27 + p**2 * j
+    c = cbrt(q / 2 + sqrt(max(q**2 / 4 - (4 * v0**2 / 9) ** 3, 0)))
+    return c + 4 * v0**2 / 9 / c - v0 / 3
+
+
+def peakspeed(j, maxa, maxv, tp, vin, vout, tpp=1e-9):
+    """Finds peak speed of a movement without cruise segment passing exactly tp.
+
+    Travel distance is monotonic by peak speed, so the root lies in [max(vin, vout), maxv].
+    If both ramps reach maxa, distance is quadratic by peak speed and is solved directly.
+    Else the root is found with newton iterations guarded by bisection, so it always converges.
+
+    Args:
+        tpp (float, optional): Target position precision. Defaults to 1e-9.
+
+    Returns:
+        float: peak speed
+    """
+    lo = max(vin, vout)
+    hi = maxv
+    vs = lo + maxa**2 / j
+    if vs < hi and rampdist(vin, vs, j, maxa) + rampdist(vs, vout, j, maxa) <= tp:
+        b = maxa / j
+        c = (vin + vout) * maxa / j / 2 - (vin**2 + vout**2) / maxa / 2 - tp
+        return (sqrt(b**2 - 4 * c / maxa) - b) * maxa / 2
+    vp = hi
+    for _ in range(100):
+        pe = rampdist(vin, vp, j, maxa) + rampdist(vp, vout, j, maxa) - tp
+        if abs(pe) <= tpp:
+            break
+        if pe > 0:
+            hi = vp
+        else:
+            lo = vp
+        vn = vp - pe / (rampdistdv(vin, vp, j, maxa) + rampdistdv(vout, vp, j, maxa))
+        vp = vn if lo < vn < hi else (lo + hi) / 2
+    return vp
+
+
+def plan6(j, maxa, maxv, tp, vin=0, vout=0):
+    """Calculates movement plan in closed form - without iterating over time intervals.
+
+    Peak speed is maxv if the path is long enough to ramp to it and back,
+    then the rest of the path is passed at constant speed.
+    Otherwise peak speed is found by peakspeed() and there is no cruise segment.
+    Each ramp either reaches maxa (jerk, const acc, jerk) or not (jerk, jerk).
+
+    Args:
+        j (float): max jerk
+        maxa (float): max acceleration
+        maxv (float): max velocity
+        tp (float): Distance to move
+        vin (float, optional): Speed at start point. Defaults to 0.
+        vout (float, optional): Speed at end point. Defaults to 0.
+
+    Raises:
+        ValueError: If vin or vout is greater then maxv
+        PathtoshortError: If path is to short to ramp from vin to vout
+
+    Returns:
+        ndarray: List of 7 time intervals of the same layout as plan5 returns
+    """
+    tpp = 1 / 1000
+
+    if vin > maxv or vout > maxv:
+        raise ValueError(f"{vin=} and {vout=} must be smaller or equal to {maxv=}!")
+
+    vlo = max(vin, vout)
+    pmin = rampdist(vin, vlo, j, maxa) + rampdist(vlo, vout, j, maxa)
+    if pmin > tp + tpp:
+        raise PathtoshortError(
+            f"Path {tp=:.3f} is to short. To ramp from {vin=:.3f} to {vout=:.3f} with given {j=:.0f} and {maxa=:.0f} it should be not shorter than {pmin:.3f}"
+        )
+
+    pmax = rampdist(vin, maxv, j, maxa) + rampdist(maxv, vout, j, maxa)
+    if pmax <= tp:
+        vp = maxv
+        tc = (tp - pmax) / maxv
+    elif pmin >= tp:
+        vp = vlo
+        tc = 0.0
+    else:
+        vp = peakspeed(j, maxa, maxv, tp, vin, vout, tp * 1e-12)
+        tc = 0.0
+
+    tj1, ta1 = ramptimes(vp - vin, j, maxa)
+    tj2, ta2 = ramptimes(vp - vout, j, maxa)
+    return np.array((tj1, max(ta1, 0), tj1, tc, tj2, max(ta2, 0), tj2), float)
+
+
+class plancache:
+    """Bounded LRU cache in front of a planner. Moves are keyed by (j, maxa, maxv, tp, vin, vout)
+    rounded to tolerances, so a move within tolerances of a cached one reuses its plan.
+    Plans are solved with the values of the first move of a key, so end position and speed errors
+    of reused plans are within tolerances (plus planner precision).
+    Planner errors (like PathtoshortError) are cached too (as type and args) and raised as new instances on hits.
+    """
+
+    def __init__(
+        self,
+        planner=None,
+        maxsize: int = 65536,
+        tol: tuple[float, float, float, float, float, float] = (1, 0.01, 1e-3, 1e-4, 1e-3, 1e-3),
+    ):
+        """
+        Args:
+            planner (callable, optional): Planner of plan5 signature. Defaults to plan5.
+            maxsize (int, optional): Max number of cached plans. Defaults to 65536.
+            tol (tuple, optional): Quantization steps of j, maxa, maxv, tp, vin and vout.
+                Defaults to (1, 0.01, 1e-3, 1e-4, 1e-3, 1e-3).
+        """
+        self.planner = plan5 if planner is None else planner
+        self.maxsize = maxsize
+        self.tol = tuple(float(t) for t in tol)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = OrderedDict()
+
+    def key(self, j, maxa, maxv, tp, vin=0, vout=0) -> tuple[int, ...]:
+        t = self.tol
+        return (
+            round(j / t[0]),
+            round(maxa / t[1]),
+            round(maxv / t[2]),
+            round(tp / t[3]),
+            round(vin / t[4]),
+            round(vout / t[5]),
+        )
+
+    def __call__(self, j, maxa, maxv, tp, vin=0, vout=0) -> np.ndarray:
+        """Returns a plan as the planner does (a new array on each call)"""
+        k = self.key(j, maxa, maxv, tp, vin, vout)
+        res = self._cache.get(k)
+        if res is None:
+            self.misses += 1
+            try:
+                res = np.array(self.planner(j, maxa, maxv, tp, vin, vout), float)
+            except (PathtoshortError, NoconvergenceError, ValueError) as e:
+                res = (type(e), e.args)  # Not the instance, its traceback would grow with each raise
+            self._cache[k] = res
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(k)
+        if isinstance(res, tuple):
+            raise res[0](*res[1])
+        return res.copy()
+
+    def info(self) -> dict:
+        """Hit / miss statistics"""
+        n = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hitrate": self.hits / n if n else 0.0,
+        }
+
+    def clear(self):
+        """Removes cached plans and resets statistics"""
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+PLANOK = 0
+PLANTOSHORT = 1
+PLANOVERSPEED = 2
+PLANNOCONVERGENCE = 3
+
+
+def rampbatch(dv, j, maxa):
+    """Vectorized ramptimes: takes arrays of speed changes and limits, returns arrays of tj and ta"""
+    sat = dv * j >= maxa**2
+    tj = np.where(sat, maxa / j, np.sqrt(dv / j))
+    ta = np.where(sat, np.maximum(dv / maxa - maxa / j, 0), 0.0)
+    return tj, ta
+
+
+def rampdistbatch(v0, v1, j, maxa):
+    """Vectorized rampdist"""
+    tj, ta = rampbatch(np.abs(v1 - v0), j, maxa)
+    return (v0 + v1) / 2 * (2 * tj + ta)
+
+
+def rampdistdvbatch(v0, v1, j, maxa):
+    """Vectorized rampdistdv"""
+    dv = v1 - v0
+    sat = dv * j >= maxa**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            sat,
+            v1 / maxa + maxa / j / 2,
+            np.sqrt(dv / j) + (v0 + v1) / 2 / np.sqrt(dv * j),
+        )
+
+
+def plan_batch(j, maxa, maxv, tp, vin, vout):
+    """Calculates movement plans of many moves at once. Vectorized version of plan6.
+    All args are broadcasted against each other, so limits can be given either as
+    scalars or per move arrays.
+
+    Args:
+        j (float | ndarray): max jerk
+        maxa (float | ndarray): max acceleration
+        maxv (float | ndarray): max velocity
+        tp (ndarray): Distances to move
+        vin (ndarray): Speeds at start points
+        vout (ndarray): Speeds at end points
+
+    Returns:
+        tuple:
+            ts (ndarray): (N, 7) array of time intervals. Rows with failed status are zeros.
+            status (ndarray): (N,) array of status codes:
+                PLANOK: plan is calculated
+                PLANTOSHORT: path is to short to ramp from vin to vout (plan6 raises PathtoshortError)
+                PLANOVERSPEED: vin or vout is greater then maxv (plan6 raises ValueError)
+                PLANNOCONVERGENCE: peak speed root-finding didn't converge
+    """
+    tpp = 1 / 1000
+
+    j, maxa, maxv, tp, vin, vout = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, float)) for x in (j, maxa, maxv, tp, vin, vout))
+    )
+    status = np.full(tp.shape, PLANOK, np.int8)
+
+    status[(vin > maxv) | (vout > maxv)] = PLANOVERSPEED
+    vlo = np.maximum(vin, vout)
+    pmin = rampdistbatch(vin, vlo, j, maxa) + rampdistbatch(vlo, vout, j, maxa)
+    status[(status == PLANOK) & (pmin > tp + tpp)] = PLANTOSHORT
+    pmax = rampdistbatch(vin, maxv, j, maxa) + rampdistbatch(maxv, vout, j, maxa)
+    ok = status == PLANOK
+    full = ok & (pmax <= tp)
+    vp = np.where(full, maxv, vlo)
+
+    # Both ramps reach maxa: distance is quadratic by peak speed
+    reduced = ok & ~full & (pmin < tp)
+    vs = vlo + maxa**2 / j
+    quad = reduced & (vs < maxv)
+    quad[quad] = (
+        rampdistbatch(vin[quad], vs[quad], j[quad], maxa[quad])
+        + rampdistbatch(vs[quad], vout[quad], j[quad], maxa[quad])
+        <= tp[quad]
+    )
+    b = maxa[quad] / j[quad]
+    c = (
+        (vin[quad] + vout[quad]) * b / 2
+        - (vin[quad] ** 2 + vout[quad] ** 2) / maxa[quad] / 2
+        - tp[quad]
+    )
+    vp[quad] = (np.sqrt(b**2 - 4 * c / maxa[quad]) - b) * maxa[quad] / 2
+
+    # Else newton iterations guarded by bisection on still unconverged rows
+    idx = np.flatnonzero(reduced & ~quad)
+    lo = vlo[idx]
+    hi = maxv[idx].copy()
+    v = hi.copy()
+    for _ in range(100):
+        if not len(idx):
+            break
+        jj, aa, vi, vo, pp = j[idx], maxa[idx], vin[idx], vout[idx], tp[idx]
+        pe = rampdistbatch(vi, v, jj, aa) + rampdistbatch(v, vo, jj, aa) - pp
+        hi = np.where(pe > 0, v, hi)
+        lo = np.where(pe > 0, lo, v)
+        done = (np.abs(pe) <= pp * 1e-12) | (hi - lo <= hi * 1e-15)
+        vp[idx[done]] = v[done]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vn = v - pe / (
+                rampdistdvbatch(vi, v, jj, aa) + rampdistdvbatch(vo, v, jj, aa)
+            )
+        v = np.where((vn > lo) & (vn < hi), vn, (lo + hi) / 2)
+        keep = ~done
+        idx, lo, hi, v = idx[keep], lo[keep], hi[keep], v[keep]
+    status[idx] = PLANNOCONVERGENCE
+
+    tc = np.where(full, (tp - pmax) / maxv, 0.0)
+    tj1, ta1 = rampbatch(np.maximum(vp - vin, 0), j, maxa)
+    tj2, ta2 = rampbatch(np.maximum(vp - vout, 0), j, maxa)
+    ts = np.stack((tj1, ta1, tj1, tc, tj2, ta2, tj2), axis=1)
+    ts[status != PLANOK] = 0
+    return ts, status
+
+
+def integratebatch(ts, j, vin):
+    """Vectorized integratetolist for plans of plan_batch (jerks are (1, 0, -1, 0, -1, 0, 1) * j).
+
+    Args:
+        ts (ndarray): (N, 7) array of time intervals
+        j (float | ndarray): max jerk
+        vin (float | ndarray): Speeds at start points
+
+    Returns:
+        ndarray: (N, 8, 3) array of a, v, p at segment boundaries
+    """
+    ts = np.atleast_2d(np.asarray(ts, float))
+    js = np.array((1, 0, -1, 0, -1, 0, 1), float) * np.asarray(j, float)[..., None]
+    js = np.broadcast_to(js, ts.shape)
+    out = np.empty((len(ts), 8, 3), float)
+    a = np.zeros(len(ts), float)
+    v = np.broadcast_to(np.asarray(vin, float), a.shape)
+    p = np.zeros(len(ts), float)
+    out[:, 0, 0] = a
+    out[:, 0, 1] = v
+    out[:, 0, 2] = p
+    for i in range(7):
+        t = ts[:, i]
+        jj = js[:, i]
+        p = jj * t**3 / 6 + a * t**2 / 2 + v * t + p
+        v = jj * t**2 / 2 + a * t + v
+        a = jj * t + a
+        out[:, i + 1, 0] = a
+        out[:, i + 1, 1] = v
+        out[:, i + 1, 2] = p
+    return out
@@ -0,0 +1,230 @@
+"""
+Numba compiled versions of profiler iterative solvers.
+Kernels repeat profiler.calcspeedramp, alignspeed and plan5 step by step, but work on plain arrays
+and return status codes instead of raising, so they can be compiled in nopython mode.
+If numba is not installed kernels stay uncompiled and profiler uses its own pure-Python versions.
+"""
+
+from math import sqrt
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+available = njit is not None
+
+OK = 0
+PATHTOSHORT = 1
+NOCONVERGENCE = 2
+
+
+def jit(f):
+    if available:
+        return njit(cache=True, error_model="numpy")(f)
+    return f
+
+
+@jit
+def integratetolist(ts, js, vin, out):
+    a = 0.0
+    v = vin
+    p = 0.0
+    out[0, 0] = a
+    out[0, 1] = v
+    out[0, 2] = p
+    for i in range(7):
+        t = ts[i]
+        j = js[i]
+        p = j * t**3.0 / 6 + a * t**2.0 / 2 + v * t + p
+        v = j * t**2.0 / 2 + a * t + v
+        a = j * t + a
+        out[i + 1, 0] = a
+        out[i + 1, 1] = v
+        out[i + 1, 2] = p
+
+
+@jit
+def settime(ts, key, value, clamp):
+    """Sets ts[key]. If clamp is True mimics profiler.times: value is limited to >= 0
+    and jerk segments 0, 2 and 4, 6 are set in pairs.
+    """
+    if clamp:
+        if value < 0:
+            value = 0.0
+        if key == 0 or key == 2:
+            ts[0] = value
+            ts[2] = value
+            return
+        if key == 4 or key == 6:
+            ts[4] = value
+            ts[6] = value
+            return
+    ts[key] = value
+
+
+@jit
+def alignspeed(ts, js, vin, vout, maxa, maxv, tvp, s, avps, clamp):
+    integratetolist(ts, js, vin, avps)
+    up = 0
+    while abs(avps[7, 1] - vout) > tvp:
+        if avps[7, 1] < vout:
+            if up == -1:
+                s /= 2
+            up = 1
+            if ts[5] > 0:
+                settime(ts, 5, max(ts[5] - s, 0.0), clamp)
+            elif ts[4] > 0:
+                settime(ts, 4, max(ts[4] - s, 0.0), clamp)
+                settime(ts, 6, ts[4], clamp)
+            elif avps[1, 0] < maxa:
+                settime(ts, 0, ts[0] + s, clamp)
+                settime(ts, 2, ts[0], clamp)
+            elif avps[3, 1] < maxv:
+                settime(ts, 1, ts[1] + s, clamp)
+        if avps[7, 1] > vout:
+            if up == 1:
+                s /= 2
+            up = -1
+            if -avps[5, 0] < maxa:
+                settime(ts, 4, ts[4] + s, clamp)
+                settime(ts, 6, ts[4], clamp)
+            else:
+                settime(ts, 5, ts[5] + s, clamp)
+        integratetolist(ts, js, vin, avps)
+        if s == 0:
+            return NOCONVERGENCE
+    return OK
+
+
+@jit
+def calcspeedramp(ts, js, vin, vout, maxa, maxv, tp, tvp, tpp, avps, clamp):
+    integratetolist(ts, js, vin, avps)
+
+    s = 1 / 100
+    up = 0
+
+    while abs(avps[7, 1] - vout) > tvp:
+        if avps[7, 1] < vout:
+            if up == -1:
+                s /= 2
+            up = 1
+            if ts[5] > 0:
+                settime(ts, 5, max(ts[5] - s, 0.0), clamp)
+            elif ts[4] > 0:
+                settime(ts, 4, max(ts[4] - s, 0.0), clamp)
+                settime(ts, 6, ts[4], clamp)
+            elif avps[1, 0] < maxa:
+                settime(ts, 0, ts[0] + min(s, (maxa - avps[1, 0]) / js[0]), clamp)
+                settime(ts, 2, ts[0], clamp)
+            else:
+                if ts[0]:
+                    settime(
+                        ts,
+                        1,
+                        ts[1] + min(s, (maxv - avps[3, 1]) / ts[0] / js[0]),
+                        clamp,
+                    )
+                else:
+                    settime(ts, 1, ts[1] + s, clamp)
+        elif avps[7, 1] > vout:
+            if up == 1:
+                s /= 2
+            up = -1
+            if ts[1] > 0:
+                settime(ts, 1, max(ts[1] - s, 0.0), clamp)
+            elif ts[0] > 0:
+                settime(ts, 0, max(ts[0] - s, 0.0), clamp)
+                settime(ts, 2, ts[0], clamp)
+            elif -avps[5, 0] < maxa:
+                settime(ts, 4, ts[4] + min(s, (maxa + avps[5, 0]) / js[0]), clamp)
+                settime(ts, 6, ts[4], clamp)
+            else:
+                if ts[3]:
+                    settime(
+                        ts,
+                        5,
+                        ts[5] + min(s, (vout - avps[7, 1]) / ts[3] / js[0]),
+                        clamp,
+                    )
+                else:
+                    settime(ts, 5, ts[5] + s, clamp)
+        integratetolist(ts, js, vin, avps)
+
+    if avps[7, 2] > tp + tpp:
+        return PATHTOSHORT
+
+    return OK
+
+
+@jit
+def plan5(ts, js, j, maxa, maxv, tp, vin, vout, tvp, tpp, avps):
+    """Main loop of profiler.plan5. ts must be a start guess (calcspeedramp or plan5 init)."""
+    integratetolist(ts, js, vin, avps)
+    s = 1 / 100
+    up = 0
+    while abs(tp - avps[7, 2]) > tpp or abs(vout - avps[7, 1]) > tvp:
+        upp = 0
+        ss = s / 10
+        while abs(vout - avps[7, 1]) > tvp:
+            if avps[7, 1] > vout + tvp:
+                if upp == -1:
+                    ss /= 2
+                upp = 1
+                if avps[7, 2] <= tp:
+                    tj = maxa / j
+                    if ts[4] < tj:
+                        settime(ts, 4, min(ts[4] + ss, tj), True)
+                    else:
+                        settime(ts, 5, ts[5] + ss, True)
+                if avps[7, 2] > tp:
+                    if up == 1:
+                        s /= 2
+                    up = -1
+                    if ts[1] > 0:
+                        settime(ts, 1, ts[1] - ss, True)
+                    else:
+                        settime(ts, 0, ts[0] - ss, True)
+            if avps[7, 1] < vout - tvp:
+                if upp == 1:
+                    ss /= 2
+                upp = -1
+                if ts[5] > 0:
+                    settime(ts, 5, ts[5] - ss, True)
+                elif ts[4] > 0:
+                    settime(ts, 4, ts[4] - ss, True)
+                else:
+                    if up == -1:
+                        s /= 2
+                    up = 1
+                    tj = min(maxa / j, sqrt((maxv - vin) / j))
+                    if ts[0] < tj:
+                        settime(ts, 0, min(ts[0] + s, tj), True)
+                    else:
+                        ta = (maxv - vin) / (j * ts[0]) - ts[0] if ts[0] else 0.0
+                        settime(ts, 1, min(ts[1] + s, ta), True)
+            integratetolist(ts, js, vin, avps)
+
+        if avps[7, 2] < tp - tpp:
+            if up == -1:
+                s /= 2
+            up = 1
+            tj = min(maxa / j, sqrt((maxv - vin) / j))
+            ta = (maxv - vin) / (j * ts[0]) - ts[0] if ts[0] else 0.0
+            if ts[0] < tj:
+                settime(ts, 0, min(ts[0] + s, tj), True)
+            elif ts[1] < ta:
+                settime(ts, 1, min(ts[1] + s, ta), True)
+            else:
+                settime(ts, 3, (tp - avps[7, 2]) / avps[3, 1], True)
+        if avps[7, 2] > tp + tpp:
+            if up == 1:
+                s /= 2
+            up = -1
+            if ts[3] > 0:
+                settime(ts, 3, 0.0, True)
+            elif ts[1] > 0:
+                settime(ts, 1, ts[1] - s, True)
+            else:
+                settime(ts, 0, ts[0] - s, True)
+        integratetolist(ts, js, vin, avps)
@@ -0,0 +1,67 @@
+"""
+Rotations of 3d vectors about an axis with Rodrigues' formula:
+R = I + sin(a) K + (1 - cos(a)) K^2, where K is the cross product matrix of the unit axis.
+Axis terms are computed once per rotation object (i.e. once per arc), then it is applied
+to many vectors or many angles with a single matrix product.
+"""
+
+from math import sqrt, sin, cos
+import numpy as np
+from numpy import ndarray
+
+_EYE = np.eye(3)
+
+
+class rotation:
+    def __init__(self, axis: ndarray):
+        """Precomputes Rodrigues terms of the axis
+
+        Args:
+            axis (ndarray): Rotation axis, only first 3 coordinates are used. Must not be zero.
+
+        Raises:
+            ZeroDivisionError: If axis is zero
+        """
+        x, y, z = np.asarray(axis, float)[:3].tolist()
+        n = sqrt(x * x + y * y + z * z)
+        if not n:
+            raise ZeroDivisionError("Rotation axis must not be zero")
+        x, y, z = x / n, y / n, z / n
+        self.axis = np.array((x, y, z))
+        self.k = np.array(((0, -z, y), (z, 0, -x), (-y, x, 0)))  # k @ v = axis x v
+        self.kk = self.k @ self.k
+
+    def matrix(self, angle: float | ndarray) -> ndarray:
+        """Rotation matrices for angles
+
+        Args:
+            angle (float | ndarray): Angle or array of angles (rad)
+
+        Returns:
+            ndarray: (3, 3) matrix or (..., 3, 3) array of matrices
+        """
+        if np.ndim(angle) == 0:
+            return _EYE + sin(angle) * self.k + (1 - cos(angle)) * self.kk
+        a = np.asarray(angle, float)[..., None, None]
+        return _EYE + np.sin(a) * self.k + (1 - np.cos(a)) * self.kk
+
+    def __call__(self, v: ndarray, angle: float | ndarray, out: ndarray | None = None) -> ndarray:
+        """Rotates vectors by angle, or a vector by array of angles
+
+        Args:
+            v (ndarray): (3,) vector or (M, 3) array of vectors (for scalar angle)
+            angle (float | ndarray): Angle or (K,) array of angles (rad)
+            out (ndarray, optional): Output array of result shape ((M, 3) or (K, 3))
+
+        Returns:
+            ndarray: Rotated vectors
+        """
+        m = self.matrix(angle)
+        if m.ndim == 2:
+            return np.matmul(v, m.T, out=out)
+        return np.matmul(m, v, out=out)
+
+
+def rotate(v: ndarray, axis: ndarray, angle: float | ndarray, out: ndarray | None = None) -> ndarray:
+    """Rotates 3d vectors about axis, see rotation.__call__"""
+    return rotation(axis)(v, angle, out)
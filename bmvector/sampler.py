@@ -0,0 +1,70 @@
+"""
+Fixed rate trajectory sampling: position, speed and acceleration of all axes of planned moves
+at times k / rate (like a servo loop reads them).
+Segment of each sample is found with searchsorted on start times of all segments of a chunk of moves,
+then the cubic of the segment is evaluated in closed form from its start state (profiler.integratebatch).
+Samples are yielded in blocks, so a long job can be sampled at high rate with bounded memory.
+"""
+
+import math
+import numpy as np
+from .profiler import integratebatch
+
+_JERKS = np.array((1, 0, -1, 0, -1, 0, 1), float)
+
+
+def sample(moves, ts, j, vin, rate=1000, start=None, chunksize=100000, movechunk=10000):
+    """Samples planned moves at fixed rate. Samples are taken at times k / rate from the queue start,
+    the last one is not later than the queue end.
+
+    Args:
+        moves (ndarray): (N, 7+) array of moves of format [XYZABCE...]
+        ts (ndarray): (N, 7) array of planned time intervals (as profiler.plan_batch returns)
+        j (float | ndarray): Max jerks used for planning
+        vin (ndarray): (N,) array of speeds at start points
+        rate (float, optional): Sampling rate (Hz). Defaults to 1000.
+        start (ndarray, optional): Start position. Defaults to zeros.
+        chunksize (int, optional): Max number of samples yielded at once. Defaults to 100000.
+        movechunk (int, optional): Number of moves processed at once. Defaults to 10000.
+
+    Yields:
+        tuple: Block of samples:
+            times (ndarray): (K,) array of sample times
+            pos (ndarray): (K, 7) array of positions
+            vel (ndarray): (K, 7) array of speeds
+            acc (ndarray): (K, 7) array of accelerations
+    """
+    pos = np.zeros(7, float) if start is None else np.array(start, float)[:7]
+    j = np.broadcast_to(np.asarray(j, float), (len(moves),))
+    vin = np.broadcast_to(np.asarray(vin, float), (len(moves),))
+    t0 = 0.0
+    for c in range(0, len(moves), movechunk):
+        m = np.asarray(moves[c : c + movechunk], float)[:, :7]
+        tsc = np.asarray(ts[c : c + movechunk], float)
+        n = len(m)
+        avps = integratebatch(tsc, j[c : c + n], vin[c : c + n])
+        tb = np.zeros((n, 8), float)
+        np.cumsum(tsc, axis=1, out=tb[:, 1:])
+        tstart = t0 + np.r_[0, np.cumsum(tb[:, 7])[:-1]]
+        bounds = (tstart[:, None] + tb[:, :7]).ravel()  # Start times of all segments
+        x0 = pos + np.r_[np.zeros((1, 7)), np.cumsum(m, axis=0)[:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = np.where(avps[:, 7:, 2] > 0, m / avps[:, 7:, 2], 0)  # Axis distance per planned distance
+        t1 = tstart[-1] + tb[-1, 7]
+        k0 = math.ceil(t0 * rate)
+        k1 = math.floor(t1 * rate) + 1 if c + n == len(moves) else math.ceil(t1 * rate)
+        t0 = t1
+        pos = x0[-1] + m[-1]
+
+        for k in range(k0, k1, chunksize):
+            times = np.arange(k, min(k + chunksize, k1)) / rate
+            idx = np.maximum(np.searchsorted(bounds, times, side="right") - 1, 0)
+            mi, seg = np.divmod(idx, 7)
+            dt = times - bounds[idx]
+            b = avps[mi, seg]
+            jj = _JERKS[seg] * j[c + mi]
+            a = jj * dt + b[:, 0]
+            v = (jj * dt / 2 + b[:, 0]) * dt + b[:, 1]
+            p = ((jj * dt / 6 + b[:, 0] / 2) * dt + b[:, 1]) * dt + b[:, 2]
+            um = u[mi]
+            yield times, x0[mi] + p[:, None] * um, v[:, None] * um, a[:, None] * um
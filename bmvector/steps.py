@@ -0,0 +1,112 @@
+"""
+Step pulse generation: converts planned moves into times of step pulses of each axis.
+Distance along a move is a piecewise cubic of time (profiler.integrate), so the time of a step is
+found by solving the cubic for the distance where the axis crosses the middle between two step positions.
+Moves are processed in chunks, so memory use doesn't depend on queue length
+(moves and ts can be memory-mapped, like gparser.cachedload returns).
+"""
+
+import numpy as np
+from .profiler import integratebatch
+
+
+def solvecubic(p0, v0, a0, j, dt, s, tol=1e-12):
+    """Finds times of reaching distances s on segments with constant jerk.
+    Newton iterations are guarded by bisection, as distance is not decreasing on segment.
+
+    Args:
+        p0, v0, a0 (ndarray): (K,) arrays of position, speed and acceleration at segment start
+        j (ndarray): (K,) array of segment jerks
+        dt (ndarray): (K,) array of segment durations
+        s (ndarray): (K,) array of distances to reach
+        tol (float, optional): Time tolerance (s). Defaults to 1e-12.
+
+    Returns:
+        ndarray: (K,) array of times from segment start, clipped to [0, dt]
+    """
+    lo = np.zeros_like(dt)
+    hi = dt.copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(v0 > 0, (s - p0) / v0, dt / 2)
+    t = np.clip(t, lo, hi)
+    res = t.copy()
+    idx = np.arange(len(t))
+    for _ in range(100):
+        if not len(idx):
+            break
+        f = ((j * t / 6 + a0 / 2) * t + v0) * t + p0 - s
+        df = (j * t / 2 + a0) * t + v0
+        lo = np.where(f < 0, t, lo)
+        hi = np.where(f > 0, t, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tn = t - f / df
+        tn = np.where((tn > lo) & (tn < hi), tn, (lo + hi) / 2)
+        done = (np.abs(tn - t) <= tol) | (f == 0) | (hi - lo <= tol)
+        res[idx] = tn
+        keep = ~done
+        idx, t, lo, hi = idx[keep], tn[keep], lo[keep], hi[keep]
+        p0, v0, a0, j, s = p0[keep], v0[keep], a0[keep], j[keep], s[keep]
+    return res
+
+
+def steptimes(moves, ts, j, vin, spm, start=None, t0=0.0, chunksize=10000):
+    """Generates step pulses of planned moves. Axis position is rounded to the nearest step,
+    so a step is made when the axis passes the middle between two step positions.
+
+    Args:
+        moves (ndarray): (N, 7+) array of moves of format [XYZABCE...]
+        ts (ndarray): (N, 7) array of planned time intervals (as profiler.plan_batch returns)
+        j (float | ndarray): Max jerks used for planning
+        vin (ndarray): (N,) array of speeds at start points
+        spm (ndarray): (7,) steps per mm (or deg) of each axis, 0 for axes without steppers
+        start (ndarray, optional): Start position. Defaults to zeros.
+        t0 (float, optional): Start time. Defaults to 0.
+        chunksize (int, optional): Number of moves processed at once. Defaults to 10000.
+
+    Yields:
+        tuple: Steps of a chunk of moves sorted by time:
+            times (ndarray): (K,) array of step times
+            axes (ndarray): (K,) int8 array of axis numbers
+            dirs (ndarray): (K,) int8 array of step directions (1 or -1)
+    """
+    spm = np.asarray(spm, float)
+    pos = np.zeros(7, float) if start is None else np.array(start, float)[:7]
+    j = np.broadcast_to(np.asarray(j, float), (len(moves),))
+    vin = np.broadcast_to(np.asarray(vin, float), (len(moves),))
+    for c in range(0, len(moves), chunksize):
+        m = np.asarray(moves[c : c + chunksize], float)[:, :7]
+        tsc = np.asarray(ts[c : c + chunksize], float)
+        n = len(m)
+        avps = integratebatch(tsc, j[c : c + n], vin[c : c + n])
+        tb = np.zeros((n, 8), float)  # Segment boundary times from move start
+        np.cumsum(tsc, axis=1, out=tb[:, 1:])
+        tstart = t0 + np.r_[0, np.cumsum(tb[:, 7])[:-1]]
+        t0 = tstart[-1] + tb[-1, 7]
+        x0 = pos + np.r_[np.zeros((1, 7)), np.cumsum(m, axis=0)[:-1]]
+        pos = x0[-1] + m[-1]
+
+        # Steps of each move and axis
+        c0 = np.rint(x0 * spm)
+        c1 = np.rint((x0 + m) * spm)
+        c1[:, spm == 0] = c0[:, spm == 0]
+        cnt = np.abs(c1 - c0).astype(np.int64).ravel()
+        total = cnt.sum()
+        if not total:
+            continue
+        ids = np.repeat(np.arange(n * 7), cnt)
+        k = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        mi, ax = np.divmod(ids, 7)
+        sgn = np.sign(c1 - c0).ravel()[ids]
+        level = (c0.ravel()[ids] + sgn * (k + 0.5)) / spm[ax]
+
+        # Distances along moves, scaled to planned ends
+        s = (level - x0[mi, ax]) / m[mi, ax] * avps[mi, 7, 2]
+        seg = np.minimum((avps[mi, 1:, 2] < s[:, None]).sum(axis=1), 6)
+        b = avps[mi, seg]
+        jj = np.array((1, 0, -1, 0, -1, 0, 1), float)[seg] * j[c + mi]
+        dt = tsc[mi, seg]
+        tl = solvecubic(b[:, 2], b[:, 1], b[:, 0], jj, dt, s)
+        times = tstart[mi] + tb[mi, seg] + tl
+
+        order = np.argsort(times, kind="stable")
+        yield times[order], ax[order].astype(np.int8), sgn[order].astype(np.int8)
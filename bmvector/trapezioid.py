@@ -1,6 +1,5 @@
 from math import sqrt
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 def tplaner(p, v, a):
@@ -138,21 +137,89 @@ def tplaner2(
     return np.array((t1, t2, t3), float)
 
 
+def tplaner2_batch(p, v, a, vin=0, vout=0) -> np.ndarray:
+    """Vectorized version of tplaner2. All args are broadcasted against each other.
+
+    Args:
+        p (float | ndarray): Distances to move
+        v (float | ndarray): Max speeds
+        a (float | ndarray): Max accelerations
+        vin (float | ndarray, optional): Speeds at start points. Defaults to 0.
+        vout (float | ndarray, optional): Speeds at end points. Defaults to 0.
+
+    Returns:
+        ndarray: (..., 3) array of time intervals
+    """
+    p, v, a, vin, vout = np.broadcast_arrays(*(np.asarray(x, float) for x in (p, v, a, vin, vout)))
+    t1 = np.minimum((np.sqrt(2 * a * p + vin**2 + vout**2) / sqrt(2) - vin) / a, (v - vin) / a)
+    t3 = t1 + (vin - vout) / a
+    t2 = np.maximum(0, (p + (t3**2 - 2 * t1 * t3 - t1**2) * a / 2 - (t3 + t1) * vin) / v)
+    return np.stack((t1, t2, t3), axis=-1)
+
+
+def integrateto_batch(ts, t, a, vin=0):
+    """Vectorized version of integrateto: evaluates a trapezoid plan at array of times.
+    Values at phase boundaries are the ones integrateto returns: a phase includes its end time,
+    at t == 0 acceleration is 0 and speed is vin. Before the plan start all values are zeros,
+    after its end speed and acceleration are zeros.
+
+    Args:
+        ts (ndarray): 3 time intervals of the plan
+        t (float | ndarray): Times
+        a (float): Max acceleration
+        vin (float, optional): Speed at start point. Defaults to 0.
+
+    Returns:
+        tuple: a, v, p arrays of shape of t
+    """
+    t = np.asarray(t, float)
+    t1, t2, t3 = (float(x) for x in ts)
+    v1 = vin + a * t1  # Cruise speed
+    p1 = vin * t1 + a * t1**2 / 2
+    p2 = p1 + v1 * t2
+    end = t1 + t2 + t3
+    tc = np.clip(t, 0, end)
+    td = tc - t1 - t2  # Time from deceleration start
+    phases = (tc <= t1, tc <= t1 + t2)
+    acc = np.select(phases, (a, 0.0), -a)
+    vel = np.select(phases, (vin + a * tc, v1), v1 - a * td)
+    pos = np.select(
+        phases,
+        (vin * tc + a * tc**2 / 2, p1 + v1 * (tc - t1)),
+        p2 + v1 * td - a * td**2 / 2,
+    )
+    out = (t < 0) | (t > end)
+    acc = np.where(out | (t == 0), 0.0, acc)
+    vel = np.where(out, 0.0, vel)
+    pos = np.where(t < 0, 0.0, pos)
+    return acc, vel, pos
+
+
+def tintegrator_batch(ts, t, maxa):
+    """Vectorized version of tintegrator (plan of tplaner, starting from rest).
+    Acceleration at t == 0 is maxa as tintegrator returns. Unlike tintegrator (which evaluates
+    the acceleration phase at t < 0), all values before the plan start are zeros.
+    """
+    a, v, p = integrateto_batch(ts, t, maxa)
+    return np.where(np.asarray(t) == 0, float(maxa), a), v, p
+
+
+def tjintegrator_batch(ts, t, minv, acc):
+    """Vectorized version of tjintegrator (plan of tjplaner). All values at t <= 0 are zeros as tjintegrator returns."""
+    a, v, p = integrateto_batch(ts, t, acc, minv)
+    start = np.asarray(t) <= 0
+    return np.where(start, 0.0, a), np.where(start, 0.0, v), np.where(start, 0.0, p)
+
+
 if __name__ == "__main__":
     # maxa = 10000
     # maxv = 1000
     # minv = 20
     # ts = tjplaner(200, minv, maxa, maxv)
-    # aa = []
-    # vv = []
-    # pp = []
     # tt = np.linspace(-0.01, ts.sum() + 0.01, 1000)
-    # for t in tt:
-    #     a, v, p = integrateto(ts, t, maxa, minv)
-    #     aa.append(a)
-    #     vv.append(v)
-    #     pp.append(p)
+    # aa, vv, pp = integrateto_batch(ts, tt, maxa, minv)
 
+    # import matplotlib.pyplot as plt
     # figure, axis = plt.subplots(3, 2)
     # figure.suptitle(f"Vin/Vout = {minv} mm/s, dT = {(tt[1]-tt[0])*1000:.2f} ms")
     # axis[0, 0].plot(tt, aa)
@@ -162,12 +229,8 @@ if __name__ == "__main__":
     # axis[2, 0].plot(tt, pp)
     # axis[2, 0].title.set_text("Position, mm")
 
-    # dp = []
-    # dv = []
-    # for i in range(len(tt) - 1):
-    #     dt = tt[i + 1] - tt[i]
-    #     dp.append((pp[i + 1] - pp[i]) / dt)
-    #     dv.append((vv[i + 1] - vv[i]) / dt)
+    # dp = np.diff(pp) / np.diff(tt)
+    # dv = np.diff(vv) / np.diff(tt)
 
     # axis[0, 1].plot(tt[:-1], dv)
     # axis[0, 1].title.set_text("dV/dT, mm/s²")
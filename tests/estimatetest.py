@@ -0,0 +1,77 @@
+import unittest as ut
+import copy
+from math import sqrt
+import numpy as np
+import numpy.linalg as la
+from bmvector.estimate import estimate, movetimes, scurvetimes, trapezoidtimes, layers, features, EXTRUDE, RETRACT, TRAVEL
+from bmvector.geo3 import MACHINE
+from bmvector.lookahead import junctionspeeds
+from bmvector.trapezioid import tplaner2
+
+
+class estimate_test(ut.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.moves = np.zeros((300, 8), float)
+        self.moves[:, :2] = rng.uniform(-5, 5, (300, 2))
+        self.moves[::3, 6] = 0.5
+        self.moves[::50, :2] = 0  # Extruder only moves
+        self.moves[::7, 2] = 0.2
+        self.moves[:, 7] = rng.uniform(20, 200, 300)
+
+    def reference(self, a):
+        # Sequential look-ahead passes with tplaner2
+        m = copy.copy(MACHINE)
+        m.accs = np.full(7, a)
+        ls = la.norm(self.moves[:, :7], axis=1)
+        l = ls[ls > 0]
+        mv_ = self.moves[ls > 0]
+        d = mv_[:, :7] / l[:, None]
+        _, ma, mv = m.limits(d)
+        mv = np.minimum(mv, mv_[:, 7])
+        w = np.zeros(len(l) + 1)
+        w[1:-1] = junctionspeeds(d, mv, m, 0.05)
+        for k in range(len(l)):
+            w[k + 1] = min(w[k + 1], sqrt(w[k] ** 2 + 2 * ma[k] * l[k]))
+        for k in range(len(l) - 1, -1, -1):
+            w[k] = min(w[k], sqrt(w[k + 1] ** 2 + 2 * ma[k] * l[k]))
+        return sum(tplaner2(l[k], mv[k], ma[k], w[k], w[k + 1]).sum() for k in range(len(l)))
+
+    def testsweep(self):
+        accs = np.array((300, 3000, 30000), float)
+        res = estimate(self.moves, accs=accs)
+        self.assertEqual(res.shape, (3,))
+        for a, t in zip(accs, res):
+            self.assertAlmostEqual(t, self.reference(a), 9)
+        self.assertTrue((np.diff(res) < 0).all())
+
+    def testtrapezoidtimes(self):
+        for l, a, v, vin, vout in ((100, 1000, 50, 10, 20), (1, 1000, 50, 10, 20), (10, 1000, 50, 50, 0)):
+            self.assertAlmostEqual(trapezoidtimes(l, a, v, vin, vout), tplaner2(l, v, a, vin, vout).sum(), 12)
+
+    def testgroups(self):
+        f = features(self.moves)
+        self.assertEqual(f[150], RETRACT)
+        self.assertEqual(f[3], EXTRUDE)
+        self.assertEqual(f[1], TRAVEL)
+        res = estimate(self.moves, accs=(1000, 2000), groups=f)
+        self.assertEqual(res.shape, (2, 3))
+        self.assertTrue(np.allclose(res.sum(axis=1), estimate(self.moves, accs=(1000, 2000))))
+        lay = layers(self.moves)
+        self.assertEqual(lay.max() + 1, np.count_nonzero(self.moves[:, 2]))
+        self.assertTrue((np.diff(lay) >= 0).all())
+
+    def testscurve(self):
+        # S-curve plans are slower than trapezoid ones, and converge to them with big jerk
+        t = estimate(self.moves, accs=3000)
+        ts = estimate(self.moves, accs=3000, jerks=(30000, 3e7))
+        self.assertTrue((ts > t).all())
+        self.assertAlmostEqual(ts[1] / t[0], 1, 2)
+        self.assertEqual(movetimes(self.moves).shape, (1, 300))
+
+    def testscurvefailed(self):
+        # Start speed over the feed rate: plan_batch fails on it, so trapezoid time is used, not 0
+        moves = np.array([(100, 0, 0, 0, 0, 0, 0, 10)], float)
+        res = scurvetimes(moves, accs=3000, jerks=30000, vstart=50)
+        self.assertGreater(res[0, 0], 0)
+        self.assertEqual(res[0, 0], movetimes(moves, accs=3000, vstart=50)[0, 0])
@@ -62,3 +62,34 @@ class fillet_test(ut.TestCase):
         ap = fl.arcparam(v1, v2)
         self.assertAlmostEqual(ap[0], 3.0000, 3)
         self.assertAlmostEqual(ap[1], 6.2832, 3)
+
+    def testfilletpath(self):
+        moves = np.array(
+            (
+                (10, 0, 0, 1, 2, 3, 5, 100),
+                (0, 10, 0, 1, 2, 3, 5, 50),
+                (0, 20, 0, 0, 0, 0, 5, 50),
+                (1, 1, 0, 0, 0, 0, 1, 50),
+                (-2, 0, 1, 0, 0, 0, 1, 20),
+            ),
+            float,
+        )
+        res, sdirs = fl.fillet_path(moves, 3, 1000)
+        # Sequential fillet7d, trimmed output vector is the input of the next corner
+        ref = []
+        cur = moves[0]
+        for nxt in moves[1:]:
+            r = fl.fillet7d(cur, nxt, 3, 1000)
+            if len(r) == 2:
+                ref.append(cur)
+                cur = nxt
+            else:
+                v1t, (ad, ch), cur = r
+                ref += [v1t, ch]
+        ref.append(cur)
+        self.assertEqual(res.shape, (8, 8))
+        self.assertTrue(np.allclose(res, ref))
+        self.assertTrue(np.array_equal(sdirs[1], (1, 0, 0)))
+        self.assertFalse(sdirs[2:4].any())  # Colinear moves aren't filleted
+        self.assertTrue(np.allclose(res[:, :6].sum(axis=0), moves[:, :6].sum(axis=0)))
+        self.assertRaises(ValueError, fl.fillet_path, moves, 0, 1000)
@@ -1,5 +1,10 @@
 import unittest as ut
+import os
+import math
+import tempfile
 from trials.gcode.gcodereader import gparser
+from trials.gcode.synth import synthgcode
+from bmvector.geo3 import vector
 import numpy as np
 
 
@@ -108,8 +113,40 @@ class parser_test(ut.TestCase):
         self.assertEqual(p.cpos[0], p.homepos[0])
         self.assertEqual(p.cpos[1], p.homepos[1] + 50)
 
+    def testarc(self):
+        p = gparser()
+        p.dicttovector(p.comtodict("G1 X10 Y0 F600"))
+        a = p.dicttoarc(p.comtodict("G3 X0 Y10 I-10 J0 E1"))[0]
+        self.assertEqual(a.sdir, vector(0, 1, 0))
+        self.assertAlmostEqual(a.radius, 10)
+        self.assertAlmostEqual(a.angle, math.pi / 2)
+        self.assertAlmostEqual(a.f, 10)
+        self.assertTrue(np.allclose(a.eval(0.5).asarray, (50**0.5 - 10, 50**0.5, 0, 0, 0, 0, 0.5)))
+        self.assertTrue(np.array_equal(p.cpos, (0, 10, 0, 0, 0, 0, 1)))
+        p.dicttovector(p.comtodict("G1 X10 Y0"))
+        a = p.dicttoarc(p.comtodict("G2 X0 Y10 R-10"))[0]
+        self.assertAlmostEqual(a.angle, math.pi * 3 / 2)
+        self.assertTrue(np.allclose(a.eval(0.5).asarray[:2], (-50**0.5 - 10, -(50**0.5))))
+
+    def testarcplane(self):
+        p = gparser()
+        p.plane = "G18"
+        p.dicttovector(p.comtodict("G1 Z10"))
+        a = p.dicttoarc(p.comtodict("G2 Z0 X10 K-10"))[0]
+        self.assertAlmostEqual(a.angle, math.pi * 3 / 2)
+        self.assertRaises(NotImplementedError, p.dicttoarc, p.comtodict("G2 X0 Y5 Z10 K-10"))
+
+    def testfullcircle(self):
+        p = gparser()
+        p.dicttovector(p.comtodict("G1 X10"))
+        arcs = p.dicttoarc(p.comtodict("G3 I-10 E2"))
+        self.assertEqual(len(arcs), 2)
+        self.assertTrue(np.allclose(sum(a.asarray for a in arcs), (0, 0, 0, 0, 0, 0, 2)))
+        self.assertAlmostEqual(sum(a.len for a in arcs), 20 * math.pi)
+        self.assertRaises(ValueError, p.dicttoarc, p.comtodict("G2 X1"))
+
     def testparser(self):
-        path = r"trials\gcode\3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode"
+        path = os.path.join("trials", "gcode", "3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
         p = gparser()
         pos = p.cpos[:7]
         queue = p.parse(path)
@@ -117,3 +154,92 @@ class parser_test(ut.TestCase):
             pos += move[:7]
         res = [0.00, 200.00, 48.50, 0.00, 0.00, 0.00, 4251.94]
         self.assertTrue(np.allclose(pos, res, atol=0.01), pos)
+
+    def testiterparse(self):
+        path = "trials/gcode/test.gcode"
+        queue = gparser().parse(path)
+        moves = list(gparser().iterparse(path))
+        self.assertEqual(len(moves), len(queue))
+        for a, b in zip(moves, queue):
+            self.assertTrue(np.array_equal(a, b))
+        items = list(gparser().iterparse(path, modal=True))
+        self.assertEqual(len(items), len(queue) + 2)
+        self.assertEqual([d["com"] for d in items if type(d) == dict], ["G91", "G90"])
+
+    def testload(self):
+        path = os.path.join("trials", "gcode", "3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
+        moves, coms = gparser().load(path)
+        pos = moves[:, :7].sum(axis=0)
+        res = [0.00, 200.00, 48.50, 0.00, 0.00, 0.00, 4251.94]
+        self.assertTrue(np.allclose(pos, res, atol=0.01), pos)
+        self.assertEqual(len(moves), len(coms))
+        self.assertTrue(np.all(np.isin(coms, (0, 1, 28))))
+
+    def testloadtext(self):
+        text = "G90\nG28 X Y50\nG1 X10 Y20 E1 F1200\nX15\ng01 X20 y5 E2,5\nY8\nM83\nG1 E1 ; E5\nG92 E0 X3\nG1 X4 E1\n"
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "test.gcode")
+            with open(path, "w") as f:
+                f.write(text)
+            queue = gparser().parse(path)
+        moves, coms = gparser().loadtext(text)
+        self.assertTrue(np.array_equal(moves, queue))
+        self.assertTrue(np.array_equal(coms, (28, 1, 1, 1, 1, 1)))
+
+    def testloadchunks(self):
+        text = "; header\n;\n\nG90\nG1 X10 Y20 E1 F1200 ; first\n" + "; comment only\n" * 20 + "\n\nX15\nG91\nG1 X1 E1\n; end\n"
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "test.gcode")
+            with open(path, "w") as f:
+                f.write(text)
+            queue = gparser().parse(path)
+            for chunksize in (5, 16, 40):
+                moves, coms = gparser().load(path, chunksize=chunksize)
+                self.assertTrue(np.array_equal(moves, queue), chunksize)
+            moves, coms = gparser().pload(path, processes=1, chunks=20)
+            self.assertTrue(np.array_equal(moves, queue))
+        moves, coms = gparser().loadtext("; nothing to do\n\n")
+        self.assertEqual(moves.shape, (0, 8))
+
+    def testpload(self):
+        path = os.path.join("trials", "gcode", "3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
+        queue = np.array(gparser().parse(path))
+        moves, coms = gparser().pload(path, processes=2, chunks=5)
+        self.assertTrue(np.array_equal(moves, queue))
+        self.assertEqual(len(moves), len(coms))
+
+    def testsynth(self):
+        text = synthgcode(5000, seed=3)
+        self.assertEqual(text, synthgcode(5000, seed=3))
+        self.assertEqual(text.count("\n"), 5000)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "synth.gcode")
+            with open(path, "w") as f:
+                f.write(text)
+            queue = np.array(gparser().parse(path))
+        moves, coms = gparser().loadtext(text)
+        self.assertTrue(np.array_equal(moves, queue))
+
+    def testcachedload(self):
+        text = "G91\nG1 X10 Y20 E1 F1200\nX15\nG90\nG1 X3 E2\n"
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "test.gcode")
+            with open(path, "w") as f:
+                f.write(text)
+            queue = gparser().parse(path)
+            moves, coms = gparser().cachedload(path)
+            self.assertTrue(np.array_equal(moves, queue))
+            p = gparser()
+            moves, coms = p.cachedload(path)
+            self.assertIsInstance(moves, np.memmap)
+            self.assertTrue(np.array_equal(moves, queue))
+            self.assertTrue(np.array_equal(coms, (1, 1, 1)))
+            self.assertTrue(np.array_equal(p.cpos, (3, 20, 0, 0, 0, 0, 2)))
+            p = gparser()
+            p.hspeed = 10
+            self.assertNotEqual(p.cachekey(path), gparser().cachekey(path))
+
+    def testloaderror(self):
+        self.assertRaises(ValueError, gparser().loadtext, "X10")
+        self.assertRaises(ValueError, gparser().loadtext, "G1 X1.2.3")
+        self.assertRaises(NotImplementedError, gparser().loadtext, "G2 X1 I1")
@@ -1,4 +1,4 @@
-from bmvector.geo3 import point, vector, arc
+from bmvector.geo3 import point, vector, arc, path, machine, move
 import unittest as ut
 import math
 import numpy as np
@@ -43,6 +43,13 @@ class vector_test(ut.TestCase):
         v = vector(1, 2, 3, 4, 5)
         self.assertEqual(v.len, math.sqrt(14))
 
+    def testcachedlen(self):
+        v = vector(3, 4)
+        self.assertEqual(v.len, 5)
+        v[:2] = (6, 8)
+        self.assertEqual(v.len, 10)
+        self.assertEqual(v.norm, 10)
+
     def testunit(self):
         v = vector(1, 2, 3, 4, 5)
         a = np.array((1, 2, 3, 4, 5)) / math.sqrt(55)
@@ -153,6 +160,44 @@ class arc_test(ut.TestCase):
         self.assertEqual(a.eval(1), point(2, 2, 0, 3))
         self.assertEqual(a.eval(0), point(0, 0, 0, 0))
 
+    def testevalarray(self):
+        a = arc(vector(2, 2, 0, 3), sdir=vector(1, 0))
+        ps = np.linspace(0, 1, 5)
+        ev = a.eval(ps)
+        dirs = a.dir(ps)
+        self.assertEqual(ev.shape, (5, 7))
+        for p, e, d in zip(ps, ev, dirs):
+            self.assertEqual(point(e), a.eval(p))
+            self.assertEqual(vector(d), a.dir(p))
+
+    def testcacheupdate(self):
+        a = arc(vector(2, 2), sdir=vector(1, 0))
+        self.assertEqual(a.eval(1), point(2, 2))
+        a[:2] = (4, 4)
+        self.assertEqual(a.eval(1), point(4, 4))
+        a.sdir = vector(0, 1)
+        self.assertEqual(a.dir(0), vector(0, 1))
+        self.assertAlmostEqual(a.radius, 4)
+        self.assertAlmostEqual(a.len, 2 * math.pi)
+
+    def testdirbounds(self):
+        ang = math.radians(100)  # Y direction peaks at 90 degrees, between ends
+        a = arc(vector(math.sin(ang), 1 - math.cos(ang)), sdir=vector(1, 0))
+        self.assertAlmostEqual(a.angle, ang)
+        b = a.dirbounds()
+        self.assertAlmostEqual(b[0], 1)
+        self.assertAlmostEqual(b[1], 1, 12)
+        self.assertEqual(b[2], 0)
+
+    def testmove(self):
+        m = machine()
+        a = arc(vector(2, 2), sdir=vector(1, 0))
+        mv = move(a, m)
+        self.assertAlmostEqual(mv.ma, 10000)
+        self.assertAlmostEqual(mv.mv, math.sqrt(10000 * 2))
+        mv = move(vector(1, -1), m)
+        self.assertAlmostEqual(mv.ma, 10000 * math.sqrt(2))
+
     def testttr(self):
         v1 = vector(1, 0, 0, 1, 2, 3, 4)
         v2 = vector(0, 1, 0, 1, 2, 3, 4)
@@ -190,3 +235,69 @@ class arc_test(ut.TestCase):
         vt1, a, vt2 = arc.fbydist(v1, v2, 1)
         self.assertEqual(v1 + v2, vt1 + a + vt2)
         self.assertAlmostEqual(a.radius, 2.41, 2)
+
+
+class path_test(ut.TestCase):
+    def setUp(self):
+        self.items = [
+            vector(2, 0, 0, 1),
+            arc(2, 2, 0, 3, sdir=(1, 0)),
+            vector(0, 3, 4),
+        ]
+        self.p = path.fromitems(self.items)
+
+    def testitems(self):
+        self.assertEqual(len(self.p), 3)
+        self.assertEqual(self.p[0], self.items[0])
+        self.assertEqual(self.p[1], self.items[1])
+        self.assertEqual(self.p[-1], self.items[2])
+        self.assertTrue(np.array_equal(self.p.isarc, (False, True, False)))
+
+    def testmutate(self):
+        self.assertAlmostEqual(self.p.len[1], math.pi)
+        self.p[1] = vector(1, 1)
+        self.assertEqual(self.p.len[1], math.sqrt(2))
+        self.p.insert(0, arc(2, 2, sdir=(1, 0)))
+        self.assertEqual(len(self.p), 4)
+        self.assertAlmostEqual(self.p.len[0], math.pi)
+        del self.p[0]
+        self.assertEqual(self.p[0], self.items[0])
+
+    def testprops(self):
+        for k, item in enumerate(self.items):
+            self.assertAlmostEqual(self.p.len[k], item.len)
+            self.assertAlmostEqual(self.p.norm[k], item.norm)
+        self.assertAlmostEqual(self.p.radius[1], 2)
+        self.assertAlmostEqual(self.p.angle[1], math.pi / 2)
+        self.assertEqual(self.p.radius[0], math.inf)
+
+    def testeval(self):
+        pars = np.array((0.5, 0.5, 1))
+        ev = self.p.eval(pars)
+        dirs = self.p.dir(pars)
+        for k, item in enumerate(self.items):
+            self.assertEqual(point(ev[k]), item.eval(pars[k]))
+            self.assertEqual(vector(dirs[k]), item.dir(pars[k]))
+
+    def testmoves(self):
+        moves = np.array(((1, 0, 0, 0, 0, 0, 1, 10), (0, 1, 0, 0, 0, 0, 1, 20)), float)
+        p = path.frommoves(moves)
+        self.assertTrue(np.array_equal(p.f, (10, 20)))
+        self.assertTrue(np.array_equal(p.points()[-1], (1, 1, 0, 0, 0, 0, 2)))
+
+    def testfillet(self):
+        p = path.frommoves(np.array(((10, 0, 0, 0, 0, 0, 0, 50), (0, 10, 0, 0, 0, 0, 0, 50)), float))
+        f = p.fillet(1, 1000)
+        self.assertTrue(np.array_equal(f.isarc, (False, True, False)))
+        self.assertAlmostEqual(f.radius[1], 2.41, 2)
+        self.assertTrue(np.allclose(f.points()[-1], (10, 10, 0, 0, 0, 0, 0)))
+        self.assertRaises(ValueError, f.fillet, 1, 1000)
+
+    def testlimits(self):
+        p = path.fromitems([vector(1, -1), arc(vector(2, 2), sdir=vector(1, 0))])
+        mj, ma, mv = machine().pathlimits(p)
+        for k, item in enumerate(p):
+            m = move(item)
+            self.assertAlmostEqual(m.mj, mj[k])
+            self.assertAlmostEqual(m.ma, ma[k])
+            self.assertAlmostEqual(m.mv, mv[k])
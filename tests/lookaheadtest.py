@@ -0,0 +1,113 @@
+from bmvector.lookahead import junctionspeeds, lookahead, iterlookahead
+from bmvector.geo3 import machine, path
+from trials.gcode.gcodereader import gparser
+import bmvector.profiler as pr
+import unittest as ut
+import os
+import tempfile
+import numpy as np
+
+
+class lookahead_test(ut.TestCase):
+    def teststraight(self):
+        moves = np.array([(100, 0, 0, 0, 0, 0, 0, 200)] * 3, float)
+        vin, vout = lookahead(moves)
+        self.assertTrue(np.array_equal(vin, (0, 200, 200)))
+        self.assertTrue(np.array_equal(vout, (200, 200, 0)))
+
+    def testreverse(self):
+        moves = np.array(
+            ((100, 0, 0, 0, 0, 0, 0, 200), (-100, 0, 0, 0, 0, 0, 0, 200)), float
+        )
+        vin, vout = lookahead(moves)
+        self.assertEqual(vout[0], 0)
+        self.assertEqual(vin[1], 0)
+
+    def testjunctionacc(self):
+        m = machine()
+        ang = np.radians((1, 10, 30, 60, 90, 135, 179))
+        u1 = np.zeros((len(ang), 7), float)
+        u1[:, 0] = 1
+        u2 = np.zeros((len(ang), 7), float)
+        u2[:, 0] = np.cos(ang)
+        u2[:, 1] = np.sin(ang)
+        u2[:, 2] = 0.3 * np.sin(ang)
+        u2 /= np.linalg.norm(u2, axis=1, keepdims=True)
+        dirs = np.stack((u1, u2), axis=1).reshape(-1, 7)
+        vj = junctionspeeds(dirs, np.full(len(dirs), np.inf), m, 0.05)[::2]
+        s = np.sqrt((1 + (u1 * u2).sum(axis=1)) / 2)
+        r = 0.05 * s / (1 - s)
+        d = (u2 - u1) / np.linalg.norm(u2 - u1, axis=1, keepdims=True)
+        with np.errstate(divide="ignore"):
+            alim = (m.accs / np.abs(d)).min(axis=1)
+        np.testing.assert_allclose(vj**2 / r, alim, rtol=1e-9)  # At the limit, not over or under it
+        self.assertTrue(np.all(np.abs(d * (vj**2 / r)[:, None]) <= m.accs * (1 + 1e-9)))
+
+    def testzerolength(self):
+        moves = np.array(
+            (
+                (100, 0, 0, 0, 0, 0, 0, 200),
+                (0, 0, 0, 0, 0, 0, 0, 100),
+                (100, 0, 0, 0, 0, 0, 0, 200),
+            ),
+            float,
+        )
+        vin, vout = lookahead(moves)
+        self.assertEqual(vin[1], 200)
+        self.assertEqual(vout[1], 200)
+
+    def testfeasible(self):
+        rng = np.random.default_rng(0)
+        moves = np.zeros((1000, 8), float)
+        moves[:, :3] = rng.uniform(-5, 5, (1000, 3))
+        moves[:, 7] = rng.uniform(10, 500, 1000)
+        vin, vout = lookahead(moves)
+        self.assertTrue(np.array_equal(vin[1:], vout[:-1]))
+        ls = np.linalg.norm(moves[:, :7], axis=1)
+        mj, ma, mv = machine().limits(moves[:, :7] / ls[:, None])
+        mv = np.minimum(mv, moves[:, 7])
+        ts, status = pr.plan_batch(mj, ma, mv, ls, vin, vout)
+        self.assertTrue(np.all(status == pr.PLANOK))
+
+    def testiterlookahead(self):
+        rng = np.random.default_rng(1)
+        moves = np.zeros((1000, 8), float)
+        moves[:, :3] = rng.uniform(-5, 5, (1000, 3))
+        moves[:, 7] = rng.uniform(10, 500, 1000)
+        res = list(iterlookahead(moves, 2000))
+        vin, vout = lookahead(moves)
+        self.assertTrue(np.array_equal([r[1] for r in res], vin))
+        self.assertTrue(np.array_equal([r[2] for r in res], vout))
+        res = list(iterlookahead(iter(moves), 50))
+        self.assertEqual(len(res), 1000)
+        vin = np.array([r[1] for r in res])
+        vout = np.array([r[2] for r in res])
+        self.assertTrue(np.array_equal(vin[1:], vout[:-1]))
+        self.assertEqual(vout[-1], 0)
+        ls = np.linalg.norm(moves[:, :7], axis=1)
+        mj, ma, mv = machine().limits(moves[:, :7] / ls[:, None])
+        mv = np.minimum(mv, moves[:, 7])
+        ts, status = pr.plan_batch(mj, ma, mv, ls, vin, vout)
+        self.assertTrue(np.all(status == pr.PLANOK))
+
+    def testarcs(self):
+        # Line, tangent quarter arcs (G3, G2), corner, half circle by R and a full circle
+        text = "G90\nG1 X10 Y0 F6000\nG3 X20 Y10 I0 J10\nG2 X30 Y20 I10 J0\nG1 X30 Y0\nG2 X30 Y-10 R-5\nG3 X30 Y-10 I0 J5\n"
+        with tempfile.TemporaryDirectory() as d:
+            fn = os.path.join(d, "arcs.gcode")
+            with open(fn, "w") as f:
+                f.write(text)
+            items = gparser().parse(fn)
+            res = list(iterlookahead(gparser().iterparse(fn), 4))
+        self.assertEqual(len(res), len(items))
+        vin, vout = lookahead(items)
+        self.assertTrue(np.array_equal([r[1] for r in res], vin) and np.array_equal([r[2] for r in res], vout))
+        self.assertTrue(np.array_equal(vin[1:], vout[:-1]))
+        p = path.fromitems(items)
+        mj, ma, mv = machine().pathlimits(p)
+        mv = np.minimum(mv, p.f)
+        self.assertEqual(vout[0], min(mv[0], mv[1]))  # Tangent junctions aren't slowed
+        self.assertEqual(vout[1], min(mv[1], mv[2]))
+        self.assertLess(vout[2], vout[1] / 2)  # Corner
+        ts, status = pr.plan_batch(mj, ma, mv, p.len, vin, vout)
+        self.assertTrue(np.all(status == pr.PLANOK))
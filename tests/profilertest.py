@@ -1,3 +1,4 @@
+import traceback
 import bmvector.profiler as pr
 import unittest as ut
 import numpy as np
@@ -22,3 +23,153 @@ class Profiler(ut.TestCase):
     #     self.assertEqual(a, -200)
     #     self.assertEqual(v, -2365)
     #     self.assertAlmostEqual(p, 3411.667, 3)
+
+    def testintegratetolist(self):
+        ts = [0.01, 0.02, 0.01, 0.1, 0.01, 0, 0.01]
+        js = [100000, 0, -100000, 0, -100000, 0, 100000]
+        avps = pr.integratetolist(ts, js, 10)
+        self.assertTrue(np.array_equal(avps, pr.integratetolist(np.array(ts), np.array(js, float), 10)))
+        self.assertTrue(np.array_equal(avps, pr.integratetolist(tuple(ts), tuple(js), 10)))
+        out = np.empty((8, 3), float)
+        self.assertIs(pr.integratetolist(ts, js, 10, out), out)
+        self.assertTrue(np.array_equal(out, avps))
+        a, v, p = pr.integrate(ts[0], js[0], 0, 10, 0)
+        self.assertTrue(np.allclose(avps[1], (a, v, p), rtol=1e-12))
+
+    def testplan6(self):
+        j, maxa, maxv = 100000, 10000, 1000
+        js = np.array((1, 0, -1, 0, -1, 0, 1), float) * j
+        rng = np.random.default_rng(0)
+        for tp, vin, vout in rng.uniform((0, 0, 0), (300, maxv, maxv), (2000, 3)):
+            try:
+                ts = pr.plan6(j, maxa, maxv, tp, vin, vout)
+            except pr.PathtoshortError:
+                continue
+            avps = pr.integratetolist(ts, js, vin)
+            self.assertTrue(np.all(ts >= 0))
+            self.assertAlmostEqual(avps[7, 2], tp, 6)
+            self.assertAlmostEqual(avps[7, 1], vout, 6)
+            self.assertLessEqual(avps[3, 1], maxv + 1e-6)
+            self.assertLessEqual(avps[1, 0], maxa + 1e-6)
+
+    def testplan6short(self):
+        self.assertRaises(pr.PathtoshortError, pr.plan6, 100000, 10000, 1000, 1, 500)
+        self.assertRaises(ValueError, pr.plan6, 100000, 10000, 1000, 1, 1500)
+
+    def testplanbatch(self):
+        j, maxa, maxv = 100000, 10000, 1000
+        rng = np.random.default_rng(0)
+        tp, vin, vout = rng.uniform((0, 0, 0), (300, 1100, maxv), (500, 3)).T
+        ts, status = pr.plan_batch(j, maxa, maxv, tp, vin, vout)
+        for i in range(len(tp)):
+            try:
+                res = pr.plan6(j, maxa, maxv, tp[i], vin[i], vout[i])
+            except pr.PathtoshortError:
+                self.assertEqual(status[i], pr.PLANTOSHORT)
+            except ValueError:
+                self.assertEqual(status[i], pr.PLANOVERSPEED)
+            else:
+                self.assertEqual(status[i], pr.PLANOK)
+                self.assertTrue(np.allclose(ts[i], res, rtol=1e-9, atol=1e-12))
+
+    @ut.skipUnless(pr.getjit("numba"), "numba is not installed")
+    def testnumbabackend(self):
+        j, maxa, maxv = 100000, 10000, 1000
+        rng = np.random.default_rng(0)
+        for tp, vin, vout in rng.uniform((0, 0, 0), (300, maxv, maxv), (200, 3)):
+            res = []
+            for backend in ("python", "numba"):
+                try:
+                    res.append(pr.plan5(j, maxa, maxv, tp, vin, vout, backend=backend))
+                except pr.PathtoshortError:
+                    res.append(None)
+            if res[0] is None:
+                self.assertIsNone(res[1])
+            else:
+                self.assertTrue(np.array_equal(res[0], res[1]))
+
+    def teststats(self):
+        self.assertIsNone(pr.STATS)
+        with pr.solvestats(keep=True) as st:
+            ts = pr.plan5(100000, 10000, 1000, 100, 100, 50, init="zeros")
+            with pr.solvestats() as inner:
+                pr.plan4(100000, 10000, 1000, 100, 100, 50)
+            self.assertIs(pr.STATS, st)
+        self.assertIsNone(pr.STATS)
+        self.assertTrue(np.array_equal(ts, pr.plan5(100000, 10000, 1000, 100, 100, 50, init="zeros")))
+        s = st.summary()
+        self.assertEqual(set(s), {"plan5", "calcspeedramp"})
+        self.assertEqual(s["plan5"]["solves"], 1)
+        self.assertGreater(s["plan5"]["iterations"], 0)
+        self.assertEqual(s["plan5"]["integrations"], s["plan5"]["iterations"] + 1)
+        self.assertEqual(set(inner.totals), {"plan4", "calcspeedramp"})
+        r = st.records()
+        self.assertEqual(len(r), 2)
+        self.assertEqual(r[r["solver"] == "plan5"]["tp"][0], 100)
+        st.merge(inner)
+        self.assertEqual(st.summary()["calcspeedramp"]["solves"], 2)
+
+    @ut.skipUnless(pr.getjit("numba"), "numba is not installed")
+    def teststatsnumba(self):
+        js = np.array((1, 0, -1, 0, -1, 0, 1), float) * 100000
+        with pr.solvestats() as st:
+            pr.plan5(100000, 10000, 1000, 100, 100, 50, backend="numba", init="zeros")
+            pr.plan5(100000, 10000, 1000, 100, 100, 50, backend="numba")
+            pr.alignspeed(pr.times(), js, 100, 50, 10000, 1000, 1 / 100, 1 / 100, backend="numba")
+        self.assertEqual(st.totals, {})  # Compiled solves are not recorded
+
+    def testplancache(self):
+        cache = pr.plancache(pr.plan6, maxsize=2)
+        ts = cache(100000, 10000, 1000, 100, 100, 50)
+        self.assertTrue(np.array_equal(ts, pr.plan6(100000, 10000, 1000, 100, 100, 50)))
+        ts[0] = -1  # Returned plans are copies
+        ts2 = cache(100000, 10000, 1000, 100 + 1e-6, 100, 50)  # Within tolerance
+        self.assertTrue(np.array_equal(ts2, pr.plan6(100000, 10000, 1000, 100, 100, 50)))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        depths = []
+        for _ in range(5):
+            try:
+                cache(100000, 10000, 1000, 1, 500)
+            except pr.PathtoshortError as e:  # Not assertRaises, it clears the traceback
+                depths.append(len(traceback.extract_tb(e.__traceback__)))
+        self.assertEqual(depths, [depths[0]] * 5)  # Raised errors don't keep frames of earlier hits
+        self.assertEqual((cache.hits, cache.misses), (5, 2))
+        cache(100000, 10000, 1000, 50)
+        info = cache.info()
+        self.assertEqual(info["evictions"], 1)
+        self.assertEqual(info["size"], 2)
+        self.assertAlmostEqual(info["hitrate"], 5 / 8)
+        cache(100000, 10000, 1000, 100, 100, 50)  # Evicted as least recently used
+        self.assertEqual(cache.misses, 4)
+        cache.clear()
+        self.assertEqual(cache.info()["size"], 0)
+
+    def testwarmstart(self):
+        j, maxa, maxv = 100000, 10000, 1000
+        js = np.array((1, 0, -1, 0, -1, 0, 1), float) * j
+        rng = np.random.default_rng(0)
+        for tp, vin, vout in rng.uniform((0, 0, 0), (300, maxv, maxv), (300, 3)):
+            try:
+                cold = pr.plan5(j, maxa, maxv, tp, vin, vout, init="zeros")
+            except pr.PathtoshortError:
+                self.assertRaises(pr.PathtoshortError, pr.plan5, j, maxa, maxv, tp, vin, vout)
+                continue
+            with pr.solvestats() as st:
+                ts = pr.plan5(j, maxa, maxv, tp, vin, vout)
+                again = pr.plan5(j, maxa, maxv, tp + 0.0005, vin, vout, init=ts)
+            self.assertEqual(st.totals["plan5"][1], 0)  # Both guesses are within tolerances
+            for res in (ts, again):
+                avps = pr.integratetolist(res, js, vin)
+                self.assertAlmostEqual(avps[7, 2], tp, 2)
+                self.assertAlmostEqual(avps[7, 1], vout, 1)
+            self.assertAlmostEqual(float(ts.sum()), float(cold.sum()), 3)
+        self.assertRaises(ValueError, pr.plan5, j, maxa, maxv, 10, init="ones")
+
+    def testplan5maxv(self):
+        # Moves starting at max speed (common after lookahead), used to fail with unbound ta
+        v = 3.3333333333333335
+        backends = ("python", "numba") if pr.getjit("numba") else ("python",)
+        for backend in backends:
+            for init in ("zeros", "trapezoid"):
+                ts = pr.plan5(100000, 10000, v, 10, v, v, backend=backend, init=init)
+                self.assertAlmostEqual(ts[3], 3, 3)
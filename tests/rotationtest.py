@@ -0,0 +1,28 @@
+import unittest as ut
+import math
+import numpy as np
+from bmvector.rotation import rotation, rotate
+
+
+class rotation_test(ut.TestCase):
+    def testrotate(self):
+        r = rotate(np.array((1, 0, 0), float), np.array((0, 0, 2), float), math.pi / 2)
+        self.assertTrue(np.allclose(r, (0, 1, 0)))
+
+    def testmany(self):
+        rot = rotation(np.array((0, 0, 1), float))
+        vs = np.array(((1, 0, 0), (0, 1, 0), (1, 1, 1)), float)
+        out = np.empty((3, 3), float)
+        res = rot(vs, math.pi, out=out)
+        self.assertIs(res, out)
+        self.assertTrue(np.allclose(res, ((-1, 0, 0), (0, -1, 0), (-1, -1, 1))))
+
+    def testangles(self):
+        rot = rotation(np.array((0, 0, 1), float))
+        angs = np.linspace(0, math.pi, 5)
+        res = rot(np.array((1, 0, 0), float), angs)
+        self.assertTrue(np.allclose(res, np.c_[np.cos(angs), np.sin(angs), np.zeros(5)]))
+        self.assertEqual(rot.matrix(angs).shape, (5, 3, 3))
+
+    def testzeroaxis(self):
+        self.assertRaises(ZeroDivisionError, rotation, np.zeros(3))
@@ -0,0 +1,31 @@
+import unittest as ut
+import numpy as np
+import bmvector.profiler as pr
+from bmvector.sampler import sample
+
+
+class sampler_test(ut.TestCase):
+    def setUp(self):
+        self.moves = np.array(((10, 0, 0, 0, 0, 0, 1), (-3, 4, 0, 0, 0, 0, 0), (0, 0, 0.5, 0, 0, 0, -1)), float)
+        l = np.linalg.norm(self.moves, axis=1)
+        self.vin = np.array((0, 20, 10), float)
+        self.ts, status = pr.plan_batch(10000, 1000, 50, l, self.vin, np.array((20, 10, 0), float))
+
+    def testsample(self):
+        res = list(sample(self.moves, self.ts, 10000, self.vin, 1000, chunksize=50, movechunk=2))
+        self.assertTrue(all(len(r[0]) <= 50 for r in res))
+        t, p, v, a = (np.concatenate(x) for x in zip(*res))
+        self.assertTrue(np.array_equal(t, np.arange(len(t)) / 1000))
+        self.assertLessEqual(t[-1], self.ts.sum())
+        self.assertGreater(t[-1] + 0.001, self.ts.sum())
+        self.assertTrue(np.allclose(p[-1], self.moves.sum(axis=0), atol=1e-6))
+
+    def testevaluate(self):
+        # Samples of the first move match integrateseq on partial time lists
+        js = np.array((1, 0, -1, 0, -1, 0, 1), float) * 10000
+        t, p, v, a = next(sample(self.moves[:1], self.ts[:1], 10000, 0, 500))
+        bounds = np.r_[0, np.cumsum(self.ts[0])]
+        _, _, pe = pr.integrateseq(self.ts[0], js, 0)
+        for i, tt in enumerate(t.tolist()):
+            aa, vv, pp = pr.integrateseq(np.clip(tt - bounds[:-1], 0, self.ts[0]), js, 0)
+            self.assertTrue(np.allclose((p[i, 0], v[i, 0], a[i, 0]), np.array((pp, vv, aa)) * 10 / pe))
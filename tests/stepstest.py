@@ -0,0 +1,45 @@
+import unittest as ut
+import numpy as np
+import bmvector.profiler as pr
+from bmvector.steps import steptimes, solvecubic
+
+
+class steps_test(ut.TestCase):
+    def setUp(self):
+        self.moves = np.array(((10, 0, 0, 0, 0, 0, 1), (-3, 4, 0, 0, 0, 0, 0), (0, 0, 0.5, 0, 0, 0, -1)), float)
+        l = np.linalg.norm(self.moves, axis=1)
+        self.vin = np.array((0, 20, 10), float)
+        vout = np.array((20, 10, 0), float)
+        self.ts, status = pr.plan_batch(10000, 1000, 50, l, self.vin, vout)
+        self.assertTrue((status == 0).all())
+        self.l = l
+
+    def testsolvecubic(self):
+        p0, v0, a0, j, dt = (np.array((x, x), float) for x in (1, 2, 3, 4, 0.5))
+        t = np.array((0.1, 0.4))
+        s = ((j * t / 6 + a0 / 2) * t + v0) * t + p0
+        self.assertTrue(np.allclose(solvecubic(p0, v0, a0, j, dt, s), t, atol=1e-12))
+
+    def testcounts(self):
+        spm = np.array((80, 80, 400, 0, 0, 0, 93), float)
+        start = np.array((0.01, 0, 0.2, 0, 0, 0, 0), float)
+        res = list(steptimes(self.moves, self.ts, 10000, self.vin, spm, start, chunksize=2))
+        times = np.concatenate([r[0] for r in res])
+        axes = np.concatenate([r[1] for r in res])
+        dirs = np.concatenate([r[2] for r in res])
+        self.assertTrue((np.diff(times) >= 0).all())
+        net = np.bincount(axes, dirs, minlength=7)
+        end = start + self.moves.sum(axis=0)
+        self.assertTrue(np.array_equal(net, np.rint(end * spm) - np.rint(start * spm)))
+        self.assertEqual(np.count_nonzero(axes == 0), 800 + 240)
+
+    def teststeplevels(self):
+        spm = np.array((80, 0, 0, 0, 0, 0, 0), float)
+        times, axes, dirs = next(steptimes(self.moves[:1], self.ts[:1], 10000, self.vin[:1], spm))
+        js = np.array((1, 0, -1, 0, -1, 0, 1), float) * 10000
+        bounds = np.r_[0, np.cumsum(self.ts[0])]
+        _, _, pe = pr.integrateseq(self.ts[0], js, 0)  # Planned length, scaled to move length
+        for k, t in enumerate(times.tolist()):
+            tt = np.clip(t - bounds[:-1], 0, self.ts[0])
+            _, _, p = pr.integrateseq(tt, js, 0)
+            self.assertAlmostEqual(p / pe * 10 * 80, k + 0.5, 6)
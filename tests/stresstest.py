@@ -0,0 +1,32 @@
+import unittest as ut
+import io
+import numpy as np
+import bmvector.profiler as pr
+from trials import stress
+
+
+class stress_test(ut.TestCase):
+    def testrun(self):
+        cases = stress.corpus(4)
+        self.assertEqual(cases.shape, (64, 3))
+        self.assertTrue(np.array_equal(cases, stress.corpus(4)))
+        orig = pr.integratetolist, pr.getjit
+        res = stress.run(pr.plan5, cases[::7])
+        self.assertEqual((pr.integratetolist, pr.getjit), orig)
+        ok = res["status"] == stress.OK
+        self.assertTrue((res["iters"][ok] > 0).all())
+        self.assertTrue((res["perr"][ok] <= 1e-3).all())
+        summary = stress.report(cases[::7], res, io.StringIO())
+        self.assertEqual(sum(summary["classes"].values()), len(cases[::7]))
+
+    def testmaxiter(self):
+        cold = lambda *args: pr.plan5(*args, init="zeros")
+        res = stress.run(cold, np.array(((100, 0, 0),), float), maxiter=3)
+        self.assertEqual(res["status"][0], stress.MAXITER)
+        self.assertEqual(res["iters"][0], 4)
+
+    @ut.skipUnless(pr.getjit("numba"), "numba is not installed")
+    def testnumba(self):
+        compiled = lambda *args: pr.plan5(*args, backend="numba")
+        self.assertRaises(ValueError, stress.run, compiled, stress.corpus(2))
+        self.assertIsNotNone(pr.getjit("numba"))  # Restored
@@ -0,0 +1,36 @@
+import unittest as ut
+import numpy as np
+import bmvector.trapezioid as tr
+
+
+class trapezioid_test(ut.TestCase):
+    def testtplaner2(self):
+        args = np.array(((2000, 500, 2000, 100, 20), (10, 500, 2000, 100, 20), (1, 50, 1000, 0, 0)), float)
+        res = tr.tplaner2_batch(*args.T)
+        self.assertEqual(res.shape, (3, 3))
+        for a, r in zip(args, res):
+            self.assertTrue(np.allclose(tr.tplaner2(*a), r, rtol=1e-12, atol=0))
+
+    @staticmethod
+    def times(ts):
+        # Plan start, exact phase boundaries (summed as the scalar integrators do), inner points and both outsides
+        inner = np.linspace(0, ts.sum(), 200)[1:-1]
+        return np.r_[-0.01, 0, ts[0], ts[:2].sum(), ts.sum(), inner, ts.sum() + 0.01]
+
+    def check(self, res, ref):
+        res = np.array(res).T
+        self.assertTrue(np.array_equal(res[:, 0], ref[:, 0]))
+        self.assertTrue(np.allclose(res, ref, rtol=1e-12, atol=1e-9))
+
+    def testintegrators(self):
+        ts = tr.tjplaner(200, 20, 10000, 1000)
+        tt = self.times(ts)
+        self.check(tr.integrateto_batch(ts, tt, 10000, 20), np.array([tr.integrateto(ts, t, 10000, 20) for t in tt]))
+        self.check(tr.tjintegrator_batch(ts, tt, 20, 10000), np.array([tr.tjintegrator(ts, t, 20, 10000) for t in tt]))
+
+        ts = tr.tplaner(100, 500, 2000)
+        tt = self.times(ts)
+        a, v, p = tr.tintegrator_batch(ts, tt, 2000)
+        ref = np.array([tr.tintegrator(ts, t, 2000) for t in tt[tt >= 0]])
+        self.check((a[tt >= 0], v[tt >= 0], p[tt >= 0]), ref)
+        self.assertTrue((np.c_[a, v, p][tt < 0] == 0).all())
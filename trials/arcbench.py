@@ -0,0 +1,39 @@
+"""Cost of arc geometry properties and geo3.move setup on an arc-heavy path
+(random XY staircase filleted with fillet_path). Run from repo root: python -m trials.arcbench [moves]
+"""
+
+import sys
+from time import perf_counter
+import numpy as np
+from bmvector.fillet import fillet_path
+from bmvector.geo3 import move, path
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+rng = np.random.default_rng(0)
+moves = np.zeros((n, 8), float)
+moves[::2, 0] = rng.uniform(1, 10, len(moves[::2]))
+moves[1::2, 1] = rng.uniform(1, 10, len(moves[1::2]))
+moves[:, 6] = 0.1
+moves[:, 7] = 50
+res, sdirs = fillet_path(moves, 0.1, 1000)
+p = path(res[:, :7], sdirs, res[:, 7])
+ia = np.flatnonzero(p.isarc).tolist()
+arcs = [p[i] for i in ia]
+print(f"{len(arcs)} arcs")
+
+
+def props(arcs):
+    for a in arcs:
+        a.radius, a.len, a.angle, a.norm, a.chordlen
+
+
+for name, f in (
+    ("properties, first", lambda: props(arcs)),
+    ("properties, again", lambda: props(arcs)),
+    ("move()", lambda: [move(a) for a in arcs]),
+    ("move() + properties", lambda: [(move(a), props([a])) for a in arcs]),
+):
+    s = perf_counter()
+    f()
+    t = perf_counter() - s
+    print(f"{name:24} {t / len(arcs) * 1e6:8.1f} us per arc")
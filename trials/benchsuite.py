@@ -0,0 +1,280 @@
+"""Benchmark suite of planner, parser and geometry hot paths.
+Inputs are made with fixed seeds, so results of different commits are comparable.
+Run from repo root:
+    python -m trials.benchsuite -o base.json                   # Save results
+    python -m trials.benchsuite --compare base.json            # Compare to saved results, exit code 1 on regression
+    python -m trials.benchsuite -k plan --repeat 7             # Only benchmarks with "plan" in the name
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import median
+from timeit import Timer
+import numpy as np
+import bmvector.profiler as pr
+from bmvector.fillet import fillet7d, fillet_path
+from bmvector.geo3 import arc, vector
+from bmvector.trapezioid import tplaner2, tplaner2_batch
+from trials.gcode.gcodereader import gparser
+from trials.gcode.synth import synthgcode
+
+BENCHES = {}  # Name: setup function returning the callable to time and number of items it processes
+_TMP = []  # Temporary directory of g-code files, removed at exit
+
+
+def bench(name: str):
+    def deco(setup):
+        BENCHES[name] = setup
+        return setup
+
+    return deco
+
+
+def _cases(n: int, seed: int = 0):
+    """Feasible (tp, vin, vout) plan cases"""
+    j, maxa, maxv = 100000, 10000, 1000
+    rng = np.random.default_rng(seed)
+    tp, vin, vout = rng.uniform((0, 0, 0), (300, maxv, maxv), (4 * n, 3)).T
+    ts, status = pr.plan_batch(j, maxa, maxv, tp, vin, vout)
+    ok = np.flatnonzero(status == pr.PLANOK)[:n]
+    return list(zip(tp[ok].tolist(), vin[ok].tolist(), vout[ok].tolist()))
+
+
+def _plans(planner, n=200):
+    cases = _cases(n)
+
+    def f():
+        for tp, vin, vout in cases:
+            planner(100000, 10000, 1000, tp, vin, vout)
+
+    return f, len(cases)
+
+
+@bench("profiler.plan4")
+def _():
+    return _plans(pr.plan4)
+
+
+@bench("profiler.plan5")
+def _():
+    return _plans(pr.plan5)
+
+
+@bench("profiler.plan6")
+def _():
+    return _plans(pr.plan6)
+
+
+@bench("profiler.plan_batch")
+def _():
+    tp, vin, vout = np.array(_cases(10000)).T
+    return lambda: pr.plan_batch(100000, 10000, 1000, tp, vin, vout), len(tp)
+
+
+@bench("profiler.integratetolist")
+def _():
+    ts = pr.plan6(100000, 10000, 1000, 100, 200, 50)
+    js = np.array((1, 0, -1, 0, -1, 0, 1), float) * 100000
+    buf = np.empty((8, 3), float)
+    return lambda: pr.integratetolist(ts, js, 200, buf), 1
+
+
+@bench("gparser.comtodict")
+def _():
+    lines = synthgcode(10000).splitlines()
+    parser = gparser()
+
+    def f():
+        for line in lines:
+            parser.comtodict(line)
+
+    return f, len(lines)
+
+
+def _gcodefile(lines):
+    if not _TMP:
+        _TMP.append(tempfile.TemporaryDirectory())
+    path = os.path.join(_TMP[0].name, f"synth{lines}.gcode")
+    with open(path, "w") as f:
+        f.write(synthgcode(lines))
+    return path
+
+
+@bench("gparser.parse")
+def _():
+    path = _gcodefile(20000)
+    return lambda: gparser().parse(path), 20000
+
+
+@bench("gparser.load")
+def _():
+    path = _gcodefile(200000)
+    return lambda: gparser().load(path), 200000
+
+
+def _corners(n, seed=0):
+    rng = np.random.default_rng(seed)
+    v = np.zeros((n + 1, 8), float)
+    ang = np.cumsum(rng.uniform(0.3, 2.5, n + 1) * rng.choice((-1, 1), n + 1))
+    v[:, 0] = np.cos(ang) * rng.uniform(5, 20, n + 1)
+    v[:, 1] = np.sin(ang) * rng.uniform(5, 20, n + 1)
+    v[:, 6] = 0.1
+    v[:, 7] = 100
+    return v
+
+
+@bench("fillet.fillet7d")
+def _():
+    v = _corners(200)
+
+    def f():
+        for i in range(200):
+            fillet7d(v[i], v[i + 1], 0.05, 1000)
+
+    return f, 200
+
+
+@bench("fillet.fillet_path")
+def _():
+    v = _corners(100000)
+    return lambda: fillet_path(v, 0.05, 1000), len(v)
+
+
+@bench("geo3.arc.eval")
+def _():
+    ps = np.linspace(0, 1, 1000)
+
+    def f():
+        a = arc(10, 5, 1, 0, 0, 0, 1, sdir=vector(1, 0, 0))  # New arc, so cached geometry is not reused
+        a.eval(ps)
+
+    return f, len(ps)
+
+
+@bench("geo3.arc.eval scalar")
+def _():
+    a = arc(10, 5, 1, 0, 0, 0, 1, sdir=vector(1, 0, 0))
+    return lambda: a.eval(0.3), 1
+
+
+@bench("trapezioid.tplaner2")
+def _():
+    p = np.random.default_rng(0).uniform(1, 100, 1000).tolist()
+
+    def f():
+        for x in p:
+            tplaner2(x, 500, 2000, 10, 10)
+
+    return f, len(p)
+
+
+@bench("trapezioid.tplaner2_batch")
+def _():
+    p = np.random.default_rng(0).uniform(1, 100, 100000)
+    return lambda: tplaner2_batch(p, 500, 2000, 10, 10), len(p)
+
+
+def measure(f, items: int, repeat: int = 5, mintime: float = 0.2) -> dict:
+    """Times a callable like timeit: number of calls is chosen to run at least mintime,
+    best and median of repeat runs are reported per item.
+    """
+    timer = Timer(f)
+    number = 1
+    while True:
+        t = timer.timeit(number)
+        if t >= mintime or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * mintime / max(t, 1e-9)))
+    runs = [t] + [timer.timeit(number) for _ in range(repeat - 1)]
+    per = [r / number / items for r in runs]
+    return {"min": min(per), "median": median(per), "number": number, "repeat": repeat, "items": items}
+
+
+def run(names=None, repeat: int = 5, mintime: float = 0.2, out=sys.stdout) -> dict:
+    """Runs benchmarks, prints a line per benchmark and returns results"""
+    res = {}
+    for name, setup in BENCHES.items():
+        if names is not None and name not in names:
+            continue
+        f, items = setup()
+        r = measure(f, items, repeat, mintime)
+        res[name] = r
+        print(f"{name:28} {r['min'] * 1e6:12.3f} us/item  median {r['median'] * 1e6:12.3f}", file=out)
+    return res
+
+
+def meta() -> dict:
+    try:
+        commit = subprocess.run(
+            ("git", "rev-parse", "--short", "HEAD"), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "backend": pr.BACKEND,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float = 0.2) -> list[str]:
+    """Compares best times of benchmarks present in both results.
+
+    Args:
+        base (dict): Results (as saved by main) to compare to
+        new (dict): New results
+        threshold (float, optional): Relative slowdown reported as regression. Defaults to 0.2.
+
+    Returns:
+        list[str]: Names of regressed benchmarks
+    """
+    reg = []
+    for name, r in new["results"].items():
+        if name not in base["results"]:
+            continue
+        ratio = r["min"] / base["results"][name]["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            reg.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = "faster"
+        print(f"{name:28} {ratio:8.2f}x {flag}")
+    return reg
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-o", "--out", help="JSON file to save results to")
+    ap.add_argument("--compare", help="JSON file of results to compare to")
+    ap.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as regression")
+    ap.add_argument("-k", help="only run benchmarks with this substring in the name")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--mintime", type=float, default=0.2, help="min time of a run (s)")
+    args = ap.parse_args(argv)
+
+    names = [n for n in BENCHES if args.k in n] if args.k else None
+    res = {"meta": meta(), "results": run(names, args.repeat, args.mintime)}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(res, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        print(f"\nCompared to {base['meta'].get('commit')} (threshold {args.threshold:.0%}):")
+        if compare(base, res, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
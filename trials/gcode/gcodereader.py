@@ -1,4 +1,127 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import numpy.linalg as la
+from bmvector.geo3 import arc
+
+COMMENT = re.compile(rb";[^\n]*")
+M117 = re.compile(rb"(?m)^[^\n]*?M117[^\n]*")
+MCODE = 1000  # Command codes are G number or MCODE + M number
+INHERIT = -2  # Code of modal lines before the first command of a text
+AXES = np.full(256, -1, int)  # Column of parameter in movement vector by upper case letter code
+AXES[[ord(c) for c in "XYZABCEF"]] = np.arange(8)
+PLANES = {"G17": (0, 1, 2), "G18": (2, 0, 1), "G19": (1, 2, 0)}  # First, second and normal axes of arc plane
+CACHEDIR = "__gcache__"  # Directory of gparser.cachedload files, next to g-code file
+CACHEVERSION = 1  # Is a part of the cache key, bump it when loading results change
+
+
+def tokenize(text: bytes):
+    """State independent part of bulk g-code loading. Finds words of the whole text at once,
+    converts all numbers with one np.fromstring call and finds commands of lines.
+
+    Args:
+        text (bytes): g-code text
+
+    Raises:
+        ValueError: If a parameter can't be converted to float
+
+    Returns:
+        tuple:
+            lcode (ndarray): (L,) array of command codes of lines, -1 for lines without a command to execute,
+                INHERIT for modal lines before the first command of the text
+            pars (ndarray): (L, 8) array of XYZABCEF parameters, nan if absent or given without value
+            given (ndarray): (L, 8) bool array of given parameters
+            lastcom (str | None): Raw last command word of the text
+    """
+    text = M117.sub(b"", COMMENT.sub(b"", text)).replace(b",", b".")
+    buf = np.frombuffer(text, np.uint8)
+    up = buf & 0xDF  # Letters to upper case
+    isletter = (up >= ord("A")) & (up <= ord("Z"))
+    isspace = (buf == ord(" ")) | ((buf >= ord("\t")) & (buf <= ord("\r")))
+    nl = np.flatnonzero(buf == ord("\n"))
+    nlines = len(nl) + 1
+    li = np.flatnonzero(isletter)
+    lines = np.searchsorted(nl, li)
+    letters = up[li]
+
+    # Words are a letter and value chars up to the next whitespace or letter
+    bound = isletter | isspace
+    seg = np.cumsum(bound, dtype=np.int32) - 1
+    valchar = ~bound & (seg >= 0) & isletter[bound][np.maximum(seg, 0)]
+    if np.any(~bound & ~valchar):
+        raise ValueError("Some words in g-code don't start with a letter")
+    word = (np.cumsum(isletter, dtype=np.int32) - 1)[valchar]
+    wlen = np.bincount(word, minlength=len(li))
+    isdigit = (buf >= ord("0")) & (buf <= ord("9"))
+    nondigit = np.bincount(word[~isdigit[valchar]], minlength=len(li))
+
+    if not len(li):  # np.fromstring of blank text returns [-1.]
+        return np.full(nlines, -1, int), np.full((nlines, 8), np.nan), np.zeros((nlines, 8), bool), None
+
+    # Letters are replaced with spaces (or 0 if word has no value), so numbers are read at once
+    vbuf = buf.copy()
+    vbuf[li] = np.where(wlen > 0, ord(" "), ord("0"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)  # Raised on unmatched data
+        try:
+            vals = np.fromstring(vbuf.tobytes(), sep=" ")
+        except DeprecationWarning:
+            vals = None
+    if vals is None or len(vals) != len(li):
+        raise ValueError("Some parameters in g-code can't be converted to float value")
+    vals[wlen == 0] = np.nan
+
+    # Commands: the last G or M word of a line. Lines without command use the last one
+    iscom = (letters == ord("G")) | (letters == ord("M"))
+    ci = np.flatnonzero(iscom)
+    ci = ci[np.append(lines[ci][1:] != lines[ci][:-1], True)[: len(ci)]]
+    codes = np.nan_to_num(vals[ci]).astype(int)
+    codes += np.where(letters[ci] == ord("M"), MCODE, 0)
+    isint = nondigit[ci] == 0  # As comtodict strips leading zeros only
+    israw = (  # Raw word is equal to canonical one, as modal lines use raw last command
+        isint
+        & (buf[li[ci]] == letters[ci])
+        & (wlen[ci] > 0)
+        & ((wlen[ci] == 1) | (buf[np.minimum(li[ci] + 1, len(buf) - 1)] != ord("0")))
+    )
+    lcode = np.full(nlines, -1, int)
+    lcode[lines[ci]] = np.where(isint, codes, -1)
+    modal = np.where(israw, codes, -1)
+    src = np.full(nlines, -1, int)
+    src[lines[ci]] = np.arange(len(ci))
+    src = np.maximum.accumulate(src)
+    haspar = np.zeros(nlines, bool)
+    haspar[lines[~iscom]] = True
+    inherit = haspar & (lcode == -1) & (src >= 0)
+    lcode[inherit] = modal[src[inherit]]
+    lcode[haspar & (src == -1)] = INHERIT
+    lastcom = None
+    if len(ci):
+        k = li[ci[-1]]
+        lastcom = buf[k : k + 1 + wlen[ci[-1]]].tobytes().decode()
+
+    # Parameters table. Parameter without value is nan
+    axis = AXES[letters]
+    pi = np.flatnonzero(axis >= 0)
+    axis = axis[pi]
+    pars = np.full((nlines, 8), np.nan)
+    given = np.zeros((nlines, 8), bool)
+    pars[lines[pi], axis] = vals[pi]
+    given[lines[pi], axis] = True
+    return lcode, pars, given, lastcom
+
+
+def tokenizefile(filepath, start: int, end: int):
+    """Tokenizes bytes start:end of memory-mapped file. Is used by gparser.pload workers."""
+    with open(filepath, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return tokenize(mm[start:end])
 
 
 class gparser:
@@ -10,6 +133,7 @@ class gparser:
         self.cspeed = 0  # mm/s
         self.homepos = np.array((0, 0, 0, 0, 0, 0, 0))
         self.hspeed = 50  # mm/s
+        self.plane = "G17"  # Arc plane
 
     def comtodict(self, line: str):
         """Strips comments and converts a line from g-code file to a dict like {'com': 'G1', 'e': -1.0, 'f': 300.0}. For comment lines (starting from ';') returns empty dict.
@@ -102,7 +226,62 @@ class gparser:
         return res
 
     def dicttoarc(self, com: dict):
-        raise NotImplementedError
+        """Converts G2/G3 command dict to arc moves in the current plane (G17, G18 or G19).
+        Center is given by I, J, K offsets from the start point or by radius R (negative R for arcs over 180 degrees).
+        Full circles are split into two halves.
+
+        Args:
+            com (dict): command dict from gparser.comtodict
+
+        Raises:
+            ValueError: If arc center can't be found
+            NotImplementedError: For helical arcs (with movement along plane normal axis)
+
+        Returns:
+            list: List of arcs (bmvector.geo3.arc) with feed rate (mm/s) in f attribute
+        """
+        start = self.cpos.copy()
+        vec = self.dicttovector(com)
+        u, v, n = PLANES[self.plane]
+        if vec[n]:
+            raise NotImplementedError(f"Helical arcs are not supported: {com}")
+        chord = vec[[u, v]]
+        if "r" in com:
+            r = com["r"]
+            d = la.norm(chord)
+            if not d or not r or abs(r) < d / 2 - 1e-9 * d:
+                raise ValueError(f"Can't find arc center for {com}")
+            h = math.sqrt(max(r * r - d * d / 4, 0)) / d
+            side = (1 if com["com"] == "G3" else -1) * (1 if r > 0 else -1)  # Center is left of chord for G3
+            c = chord / 2 + side * h * np.array((-chord[1], chord[0]))
+        else:
+            offsets = dict(zip("ijk", (0, 1, 2)))
+            c = np.zeros(2, float)
+            for key, i in offsets.items():
+                if key in com and com[key]:
+                    if i == u:
+                        c[0] = com[key]
+                    elif i == v:
+                        c[1] = com[key]
+            if not c.any():
+                raise ValueError(f"Can't find arc center for {com}")
+        rs = -c  # Radius vector at start point
+        sdir = np.array((-rs[1], rs[0])) * (1 if com["com"] == "G3" else -1)  # Start tangent
+        d3 = np.zeros(3, float)
+        d3[[u, v]] = sdir
+        moves = [vec[:7]]
+        if not chord.any():  # Full circle
+            half = vec[:7] / 2
+            half[[u, v]] = -2 * rs
+            moves = [half, half.copy()]
+            moves[1][[u, v]] *= -1
+        res = []
+        for m in moves:
+            a = arc(m, sdir=d3)
+            a.f = vec[7]
+            res.append(a)
+            d3 = -d3
+        return res
 
     def dicttohome(self, com: dict):
         """Implements homing G28 method. Homes parser to self.homepos with given axis and offset.
@@ -136,6 +315,304 @@ class gparser:
             if key in com:
                 self.cpos[i] = com[key]
 
+    def iterparse(self, filepath, modal=False):
+        """Parses g-code file lazily and yields moves one by one.
+        File is read line by line, so memory use doesn't depend on file size.
+
+        Args:
+            filepath (_type_): Path to g-code file
+            modal (bool, optional): Also yield command dicts of modal state changes (G90, G91, G92, G17, G18, G19, M82, M83). Defaults to False.
+
+        Yields:
+            ndarray | arc | dict: Movement vector, arc (for G2, G3) or (if modal is True) state change command dict
+        """
+        with open(filepath) as file:
+            for line in file:
+                d = self.comtodict(line)
+                if d:
+                    match d["com"]:
+                        case "G0" | "G1":
+                            yield self.dicttovector(d)
+                            continue
+                        case "G2" | "G3":
+                            yield from self.dicttoarc(d)
+                            continue
+                        case "G28":
+                            yield self.dicttohome(d)
+                            continue
+                        case "G90":
+                            self.absmove = True
+                            self.absextrude = True
+                        case "G91":
+                            self.absmove = False
+                            self.absextrude = False
+                        case "G92":
+                            self.setcpos(d)
+                        case "G17" | "G18" | "G19":
+                            self.plane = d["com"]
+                        case "M82":
+                            self.absextrude = True
+                        case "M83":
+                            self.absextrude = False
+                        case _:
+                            continue
+                    if modal:
+                        yield d
+
+    def loadtokens(self, lcode, pars, given, lastcom):
+        """Resolves state dependent part of bulk loading for lines tokenized with tokenize:
+        commands of modal lines at text start, positioning modes, positions and feed rate.
+        Positions are accumulated in the same order as dicttovector does, so results are equal to parse.
+        Parser state is updated as if the lines were parsed one by one.
+
+        Args:
+            lcode, pars, given, lastcom: tokenize results
+
+        Raises:
+            ValueError: If command is opposed and was not set before
+            NotImplementedError: For G2/G3 arcs
+
+        Returns:
+            tuple:
+                moves (ndarray): (N, 8) array of movement vectors of format (x,y,z,a,b,c,e,f)
+                coms (ndarray): (N,) array of command codes of moves (0, 1 or 28)
+        """
+        nlines = len(lcode)
+        inherit = lcode == INHERIT
+        if np.any(inherit):
+            if not self.lastcom:
+                raise ValueError("Command is opposed and was not set before")
+            lcode = lcode.copy()
+            prev = self.comtodict(self.lastcom)["com"]
+            if prev == self.lastcom:
+                lcode[inherit] = int(prev[1:]) + (MCODE if prev[0] == "M" else 0)
+            else:
+                lcode[inherit] = -1
+        if lastcom:
+            self.lastcom = lastcom
+        if np.any((lcode == 2) | (lcode == 3)):
+            raise NotImplementedError("G2/G3 arcs are supported by parse only")
+
+        # Positioning modes before each line, index 0 is initial state
+        absmove = np.full(nlines + 1, -1, int)
+        absextrude = np.full(nlines + 1, -1, int)
+        absmove[0] = self.absmove
+        absextrude[0] = self.absextrude
+        for code, m, e in ((90, 1, 1), (91, 0, 0), (MCODE + 82, -1, 1), (MCODE + 83, -1, 0)):
+            idx = np.flatnonzero(lcode == code) + 1
+            if m >= 0:
+                absmove[idx] = m
+            absextrude[idx] = e
+        absmove = self._ffill(absmove)
+        absextrude = self._ffill(absextrude)
+        absax = np.empty((nlines, 7), bool)
+        absax[:, :6] = absmove[:-1, None]
+        absax[:, 6] = absextrude[:-1]
+
+        # Each axis position is set by absolute moves, G28 and G92 and shifted by relative moves
+        ismove = (lcode == 0) | (lcode == 1)
+        ishome = lcode == 28
+        g = given[:, :7]
+        p = pars[:, :7]
+        setev = (ismove[:, None] & absax & g) | ((ishome | (lcode == 92))[:, None] & g)
+        setval = np.where(ishome[:, None], self.homepos + np.where(np.isnan(p), 0, p), p)
+        add = np.where(ismove[:, None] & ~absax & g, p, 0)
+
+        # Position after each line. Segments with relative moves are summed sequentially
+        cpos0 = np.asarray(self.cpos, float)
+        pos = np.empty((nlines, 7), float)
+        lines = np.arange(nlines)
+        for i in range(7):
+            sets = np.flatnonzero(setev[:, i])
+            last = np.maximum.accumulate(np.where(setev[:, i], lines, -1))
+            pos[:, i] = np.where(last >= 0, setval[np.maximum(last, 0), i], cpos0[i])
+            for s in np.unique(last[add[:, i] != 0]):
+                e = sets[np.searchsorted(sets, s, "right")] if s < sets[-1:].max(initial=-1) else nlines
+                if s >= 0:
+                    pos[s:e, i] = np.cumsum(np.r_[setval[s, i], add[s + 1 : e, i]])
+                else:
+                    pos[:e, i] = np.cumsum(np.r_[cpos0[i], add[:e, i]])[1:]
+        prev = np.vstack((cpos0, pos[:-1]))
+
+        mi = np.flatnonzero(ismove | ishome)
+        moves = np.empty((len(mi), 8), float)
+        rel = ~absax[mi] & ismove[mi, None]
+        moves[:, :7] = np.where(rel, add[mi], pos[mi] - prev[mi])
+        fl = np.maximum.accumulate(np.where(ismove & given[:, 7], lines, -1))
+        speed = np.where(fl >= 0, pars[np.maximum(fl, 0), 7] / 60, self.cspeed)
+        moves[:, 7] = np.where(ishome[mi], self.hspeed, speed[mi])
+
+        if nlines:
+            self.cpos = pos[-1].copy()
+            self.absmove = bool(absmove[-1])
+            self.absextrude = bool(absextrude[-1])
+            self.cspeed = speed[-1]
+        return moves, lcode[mi]
+
+    @staticmethod
+    def _ffill(state):
+        """Forward fills -1 entries of state array, state[0] must be set"""
+        idx = np.maximum.accumulate(np.where(state >= 0, np.arange(len(state)), 0))
+        return state[idx].astype(bool)
+
+    def loadtext(self, text: str | bytes):
+        """Bulk version of parse for a text of g-code: loadtokens(*tokenize(text))
+
+        Args:
+            text (str | bytes): g-code text
+
+        Returns:
+            tuple:
+                moves (ndarray): (N, 8) array of movement vectors of format (x,y,z,a,b,c,e,f)
+                coms (ndarray): (N,) array of command codes of moves (0, 1 or 28)
+        """
+        if isinstance(text, str):
+            text = text.encode()
+        return self.loadtokens(*tokenize(text))
+
+    @staticmethod
+    def _concat(res):
+        if not res:
+            return np.zeros((0, 8), float), np.zeros(0, int)
+        return np.vstack([r[0] for r in res]), np.concatenate([r[1] for r in res])
+
+    def load(self, filepath, chunksize=None):
+        """Bulk version of parse. Loads g-code file into an array of moves with loadtext.
+
+        Args:
+            filepath (_type_): Path to g-code file
+            chunksize (int, optional): Read file by chunks of about given size (bytes), split on line ends. Defaults to None (whole file).
+
+        Returns:
+            tuple:
+                moves (ndarray): (N, 8) array of movement vectors
+                coms (ndarray): (N,) array of command codes
+        """
+        res = []
+        with open(filepath, "rb") as file:
+            if not chunksize:
+                res.append(self.loadtext(file.read()))
+            else:
+                tail = b""
+                while chunk := file.read(chunksize):
+                    chunk = tail + chunk
+                    end = chunk.rfind(b"\n") + 1
+                    if end:
+                        res.append(self.loadtext(chunk[:end]))
+                    tail = chunk[end:]
+                if tail:
+                    res.append(self.loadtext(tail))
+        return self._concat(res)
+
+    def pload(self, filepath, processes=None, chunks=None):
+        """Parallel version of load. The file is memory-mapped and split on line ends into chunks,
+        chunks are tokenized in a process pool and then resolved one by one with loadtokens.
+        Results are equal to parse.
+
+        Args:
+            filepath (_type_): Path to g-code file
+            processes (int, optional): Number of processes. Defaults to os.cpu_count().
+            chunks (int, optional): Number of chunks. Defaults to processes.
+
+        Returns:
+            tuple:
+                moves (ndarray): (N, 8) array of movement vectors
+                coms (ndarray): (N,) array of command codes
+        """
+        processes = processes or os.cpu_count()
+        chunks = chunks or processes
+        with open(filepath, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return self._concat([])
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                bounds = [0]
+                for i in range(1, chunks):
+                    end = mm.find(b"\n", max(size * i // chunks, bounds[-1])) + 1
+                    if end <= 0:
+                        break
+                    bounds.append(end)
+                bounds.append(size)
+        bounds = sorted(set(bounds))
+        args = [(filepath, s, e) for s, e in zip(bounds[:-1], bounds[1:])]
+        if processes > 1 and len(args) > 1:
+            with ProcessPoolExecutor(processes) as pool:
+                tokens = list(pool.map(tokenizefile, *zip(*args)))
+        else:
+            tokens = [tokenizefile(*a) for a in args]
+        return self._concat([self.loadtokens(*t) for t in tokens])
+
+    def _state(self):
+        return {
+            "lastcom": self.lastcom,
+            "absmove": bool(self.absmove),
+            "absextrude": bool(self.absextrude),
+            "cpos": np.asarray(self.cpos, float).tolist(),
+            "cspeed": float(self.cspeed),
+        }
+
+    def cachekey(self, filepath):
+        """Key of file in cachedload: hash of file content, parser settings and state
+
+        Args:
+            filepath (_type_): Path to g-code file
+
+        Returns:
+            str: Hex digest
+        """
+        h = hashlib.blake2b(digest_size=20)
+        with open(filepath, "rb") as file:
+            while chunk := file.read(2**20):
+                h.update(chunk)
+        settings = {
+            "version": CACHEVERSION,
+            "homepos": np.asarray(self.homepos, float).tolist(),
+            "hspeed": float(self.hspeed),
+            "state": self._state(),
+        }
+        h.update(json.dumps(settings, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def cachedload(self, filepath, cachedir=None):
+        """Cached version of load. Results are saved to cachedir as .npy files named by cachekey,
+        so next loads of the same file with the same settings only memory-map them.
+        Parser state is restored as after loading the file.
+
+        Args:
+            filepath (_type_): Path to g-code file
+            cachedir (_type_, optional): Cache directory. Defaults to CACHEDIR next to the file.
+
+        Returns:
+            tuple:
+                moves (ndarray): (N, 8) array of movement vectors, read-only if loaded from cache
+                coms (ndarray): (N,) array of command codes, read-only if loaded from cache
+        """
+        if cachedir is None:
+            cachedir = os.path.join(os.path.dirname(os.path.abspath(filepath)), CACHEDIR)
+        base = os.path.join(cachedir, self.cachekey(filepath))
+        try:
+            with open(base + ".json") as file:  # Is written last, so other files are complete
+                state = json.load(file)
+            moves = np.load(base + ".moves.npy", mmap_mode="r")
+            coms = np.load(base + ".coms.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            moves, coms = self.load(filepath)
+            os.makedirs(cachedir, exist_ok=True)
+            for ext, data in ((".moves.npy", moves), (".coms.npy", coms)):
+                with open(base + ext + ".tmp", "wb") as file:
+                    np.save(file, data)
+                os.replace(base + ext + ".tmp", base + ext)
+            with open(base + ".json.tmp", "w") as file:
+                json.dump(self._state(), file)
+            os.replace(base + ".json.tmp", base + ".json")
+            return moves, coms
+        self.lastcom = state["lastcom"]
+        self.absmove = state["absmove"]
+        self.absextrude = state["absextrude"]
+        self.cpos = np.array(state["cpos"], float)
+        self.cspeed = state["cspeed"]
+        return moves, coms
+
     def parse(self, filepath):
         """Parses g-code file and returns a list of moves
 
@@ -145,31 +622,7 @@ class gparser:
         Returns:
             list: The list of moves
         """
-        queue = []
-        file = open(filepath)
-        for line in file:
-            d = self.comtodict(line)
-            if d:
-                match d["com"]:
-                    case "G0" | "G1":
-                        queue.append(self.dicttovector(d))
-                    case "G2" | "G3":
-                        queue.append(self.dicttoarc(d))
-                    case "G28":
-                        queue.append(self.dicttohome(d))
-                    case "G90":
-                        self.absmove = True
-                        self.absextrude = True
-                    case "G91":
-                        self.absmove = False
-                        self.absextrude = False
-                    case "G92":
-                        self.setcpos(d)
-                    case "M82":
-                        self.absextrude = True
-                    case "M83":
-                        self.absextrude = False
-        return queue
+        return list(self.iterparse(filepath))
 
 
 if __name__ == "__main__":
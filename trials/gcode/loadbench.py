@@ -0,0 +1,36 @@
+"""Lines per second of gparser.parse vs bulk gparser.load pload and cachedload on a large file.
+The file is made by repeating 3DBenchy gcode. Run from repo root: python -m trials.gcode.loadbench [repeats]
+"""
+
+import os
+import sys
+import tempfile
+from time import perf_counter
+from .gcodereader import gparser
+
+src = os.path.join("trials", "gcode", "3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
+if __name__ == "__main__":  # pload workers import this module
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "large.gcode")
+        with open(src) as f:
+            text = f.read()
+        with open(path, "w") as f:
+            for _ in range(repeats):
+                f.write(text)
+        nlines = text.count("\n") * repeats
+        print(f"{nlines} lines, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        for name, f in (
+            ("parse", lambda: gparser().parse(path)),
+            ("load", lambda: gparser().load(path)),
+            ("load by 4 MiB", lambda: gparser().load(path, chunksize=2**22)),
+            ("pload", lambda: gparser().pload(path)),
+            ("cachedload", lambda: gparser().cachedload(path)),
+            ("cached", lambda: gparser().cachedload(path)),
+        ):
+            s = perf_counter()
+            f()
+            t = perf_counter() - s
+            print(f"{name:15} {t:6.2f} s {nlines / t / 1000:8.0f} k lines/s")
@@ -0,0 +1,39 @@
+"""Synthetic g-code for benchmarks and tests: slicer-like layers of extrusion random walks,
+travels with retracts, comments and feed rate changes. Output only depends on arguments.
+"""
+
+import numpy as np
+
+
+def synthgcode(lines: int, seed: int = 0, layer: int = 2000) -> str:
+    """Generates g-code text of about given number of lines
+
+    Args:
+        lines (int): Number of lines
+        seed (int, optional): Random seed. Defaults to 0.
+        layer (int, optional): Lines per layer. Defaults to 2000.
+
+    Returns:
+        str: g-code text
+    """
+    rng = np.random.default_rng(seed)
+    out = ["; synthetic g-code", "G90", "M83", "G28", "G1 Z0.2 F3000"]
+    x, y, z = 100.0, 100.0, 0.2
+    nextlayer = layer
+    while len(out) < lines:
+        kind = rng.random()
+        if len(out) >= nextlayer:
+            nextlayer += layer
+            z += 0.2
+            out += [";LAYER_CHANGE", f"G1 Z{z:.3f} F600"]
+        elif kind < 0.05:
+            # Travel with retract and prime
+            x, y = rng.uniform(10, 190, 2)
+            out += ["G1 E-0.8 F2100", f"G0 X{x:.3f} Y{y:.3f} F7800", "G1 E0.8 F2100", ";TYPE:Perimeter"]
+        else:
+            step = rng.normal(0, 2, 2)
+            x = min(max(x + step[0], 0), 200)
+            y = min(max(y + step[1], 0), 200)
+            f = f" F{rng.choice((1200, 1800, 2400))}" if kind < 0.1 else ""
+            out.append(f"G1 X{x:.3f} Y{y:.3f} E{np.hypot(*step) * 0.033:.5f}{f}")
+    return "\n".join(out[:lines]) + "\n"
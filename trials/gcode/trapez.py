@@ -1,32 +1,22 @@
-from .gcodereader import gparser
+"""Print time vs max acceleration of Benchy with trapezoid plans.
+Run from repo root: python -m trials.gcode.trapez
+"""
+
+from time import perf_counter
 import numpy as np
-from ...bmvector.trapezioid import tplaner
-from datetime import timedelta
 import matplotlib.pyplot as plt
+from bmvector.estimate import estimate
+from .gcodereader import gparser
 
-path = r"trials\gcode\3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode"
+path = "trials/gcode/3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode"
 parser = gparser()
-queue = parser.parse(path)
-
-maxa = 5000  # mm/s²
-aa = np.geomspace(100, 10000, 20)
-ts = np.zeros(20, float)
-# print(aa,ts)
-
-for i in range(20):
-    tt = 0
-    ta = 0
-    tp = 0
-    for move in queue:
-        p = np.linalg.norm(move[:3])
-        plan = tplaner(p, aa[i], move[7])
-        ts[i] += plan.sum() / 3600
-        # ta += plan[0] + plan[2]
-        # tp += p / 1000
+queue, coms = parser.load(path)
 
+aa = np.geomspace(100, 10000, 20)  # mm/s²
+s = perf_counter()
+ts = estimate(queue, accs=aa) / 3600
+print(f"{len(aa)} accelerations estimated in {perf_counter() - s:.2f} s")
 
-# print(timedelta(seconds=tt), timedelta(seconds=ta), tp)
-# print(aa,ts)
 plt.plot(aa / 1000, ts)
 plt.title("Print time vs max acceleration")
 plt.xlabel("Acceleration, m/s²")
@@ -0,0 +1,30 @@
+"""Per call cost of profiler.integratetolist before and after allocation-free kernel.
+Run from repo root: python -m trials.integratebench
+"""
+
+from timeit import timeit
+import numpy as np
+import bmvector.profiler as pr
+
+
+def integratetolist_old(ts, js, vin):
+    res = np.zeros((8, 3), float)
+    res[0] = [0, vin, 0]
+    for i in range(7):
+        res[i + 1] = pr.integrate(ts[i], js[i], *res[i])
+    return res
+
+
+ts = pr.plan6(100000, 10000, 1000, 100, 200, 50)
+js = np.array((1, 0, -1, 0, -1, 0, 1), float) * 100000
+buf = np.empty((8, 3), float)
+n = 100000
+
+assert np.array_equal(integratetolist_old(ts, js, 200), pr.integratetolist(ts, js, 200))
+
+for name, f in (
+    ("old", lambda: integratetolist_old(ts, js, 200)),
+    ("new", lambda: pr.integratetolist(ts, js, 200)),
+    ("new, out=", lambda: pr.integratetolist(ts, js, 200, buf)),
+):
+    print(f"{name:10} {timeit(f, number=n) / n * 1e6:.2f} us/call")
@@ -0,0 +1,49 @@
+"""Hit rate and speedup of profiler.plancache on Benchy moves (after lookahead).
+Run from repo root: python -m trials.plancachebench [moves] [planner]
+"""
+
+import sys
+from time import perf_counter
+import numpy as np
+import numpy.linalg as la
+import bmvector.profiler as pr
+from bmvector.geo3 import MACHINE
+from bmvector.lookahead import lookahead
+from trials.gcode.gcodereader import gparser
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+planner = getattr(pr, sys.argv[2]) if len(sys.argv) > 2 else pr.plan5
+moves, coms = gparser().load("trials/gcode/3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
+vin, vout = lookahead(moves)
+l = la.norm(moves[:, :7], axis=1)
+nz = l > 0
+mj, ma, mv = MACHINE.limits(moves[nz, :7] / l[nz, None])
+mv = np.where(moves[nz, 7] > 0, np.minimum(mv, moves[nz, 7]), mv)
+args = list(zip(mj.tolist(), ma.tolist(), mv.tolist(), l[nz].tolist(), vin[nz].tolist(), vout[nz].tolist()))[:n]
+js = np.array((1, 0, -1, 0, -1, 0, 1), float)
+
+
+def run(f):
+    res = []
+    s = perf_counter()
+    for a in args:
+        try:
+            res.append(f(*a))
+        except Exception:  # plan5 fails on some moves, see trials.stress
+            res.append(None)
+    return res, perf_counter() - s
+
+
+ref, t0 = run(planner)
+cache = pr.plancache(planner)
+res, t1 = run(cache)
+perr = verr = 0.0
+for a, ts in zip(args, res):
+    if ts is not None:
+        avps = pr.integratetolist(ts, js * a[0], a[4])
+        perr = max(perr, abs(avps[7, 2] - a[3]))
+        verr = max(verr, abs(avps[7, 1] - a[5]))
+print(f"{len(args)} moves, {planner.__name__}: {t0:.2f} s uncached, {t1:.2f} s cached ({t0 / t1:.2f}x)")
+print(cache.info())
+print(f"failed plans: {sum(r is None for r in ref)} uncached, {sum(r is None for r in res)} cached")
+print(f"max end errors of cached plans: position {perr:.2e}, speed {verr:.2e}")
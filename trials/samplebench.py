@@ -0,0 +1,31 @@
+"""Fixed rate sampling of the whole Benchy plan: load -> lookahead -> plan_batch -> sampler.sample.
+Run from repo root: python -m trials.samplebench [rate]
+"""
+
+import sys
+from time import perf_counter
+import numpy as np
+import numpy.linalg as la
+import bmvector.profiler as pr
+from bmvector.geo3 import MACHINE
+from bmvector.lookahead import lookahead
+from bmvector.sampler import sample
+from trials.gcode.gcodereader import gparser
+
+rate = float(sys.argv[1]) if len(sys.argv) > 1 else 10000
+moves, coms = gparser().load("trials/gcode/3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
+vin, vout = lookahead(moves)
+l = la.norm(moves[:, :7], axis=1)
+nz = l > 0
+moves, vin, vout, l = moves[nz], vin[nz], vout[nz], l[nz]
+mj, ma, mv = MACHINE.limits(moves[:, :7] / l[:, None])
+mv = np.where(moves[:, 7] > 0, np.minimum(mv, moves[:, 7]), mv)
+ts, status = pr.plan_batch(mj, ma, mv, l, vin, vout)
+
+s = perf_counter()
+n = 0
+for t, p, v, a in sample(moves, ts, mj, vin, rate):
+    n += len(t)
+el = perf_counter() - s
+print(f"{n} samples at {rate:.0f} Hz ({t[-1]:.0f} s of motion) in {el:.2f} s, {n / el / 1e6:.1f} M samples/s")
+print(f"end position error {np.abs(p[-1] - moves[:, :7].sum(axis=0)).max():.2e}")
@@ -0,0 +1,33 @@
+"""Step pulse generation rate on Benchy: load -> lookahead -> plan_batch -> steps.steptimes.
+Run from repo root: python -m trials.stepbench
+"""
+
+from time import perf_counter
+import numpy as np
+import numpy.linalg as la
+import bmvector.profiler as pr
+from bmvector.geo3 import MACHINE
+from bmvector.lookahead import lookahead
+from bmvector.steps import steptimes
+from trials.gcode.gcodereader import gparser
+
+spm = np.array((80, 80, 400, 0, 0, 0, 93), float)
+moves, coms = gparser().load("trials/gcode/3DBenchy_0.2mm_PLA_MEGA0_1h48m.gcode")
+vin, vout = lookahead(moves)
+l = la.norm(moves[:, :7], axis=1)
+nz = l > 0
+moves, vin, vout, l = moves[nz], vin[nz], vout[nz], l[nz]
+mj, ma, mv = MACHINE.limits(moves[:, :7] / l[:, None])
+mv = np.where(moves[:, 7] > 0, np.minimum(mv, moves[:, 7]), mv)
+ts, status = pr.plan_batch(mj, ma, mv, l, vin, vout)
+
+s = perf_counter()
+cnt = np.zeros(7, int)
+for times, axes, dirs in steptimes(moves, ts, mj, vin, spm):
+    cnt += np.bincount(axes, minlength=7)
+el = perf_counter() - s
+print(f"{len(moves)} moves, {cnt.sum()} steps, print time {times[-1]:.0f} s, generated in {el:.2f} s")
+print(f"all axes: {cnt.sum() / el / 1e3:.0f} k steps/s")
+for ax, n in zip("XYZABCE", cnt.tolist()):
+    if n:
+        print(f"{ax}: {n:9} steps, {n / el / 1e3:8.0f} k steps/s")
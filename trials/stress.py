@@ -0,0 +1,216 @@
+"""Deterministic stress corpus of planners and convergence report.
+Cases are a regular grid over (tp, vin, vout), so runs of different commits are comparable case by case.
+Iterations are counted as calls of profiler.integratetolist (every planner integrates once per iteration),
+so only planners solved with the python backend can be run (compiled kernels integrate on their own).
+Run from repo root:
+    python -m trials.stress --planner plan5 -o plan5.npz        # Run corpus, print report, save per case data
+    python -m trials.stress --planner plan5 --compare plan5.npz # Also list cases which got worse
+"""
+
+import argparse
+import json
+import sys
+from time import perf_counter
+import numpy as np
+import bmvector.profiler as pr
+
+OK = 0
+TOSHORT = 1  # PathtoshortError
+OVERSPEED = 2  # ValueError of vin or vout over maxv
+NOCONVERGENCE = 3  # NoconvergenceError
+MAXITER = 4  # Iteration limit of the harness reached
+INACCURATE = 5  # Plan returned, but end position or speed is off
+ERROR = 6  # Any other exception
+CLASSES = ("ok", "toshort", "overspeed", "noconvergence", "maxiter", "inaccurate", "error")
+
+PLANNERS = {"plan4": pr.plan4, "plan5": pr.plan5, "plan6": pr.plan6}
+
+
+class _Maxiter(Exception):
+    pass
+
+
+class _Compiled(Exception):
+    pass
+
+
+class counter:
+    """Replaces profiler.integratetolist with a counting wrapper while active.
+    profiler.getjit is replaced too, solvers selecting the numba backend raise _Compiled,
+    as their iterations can't be counted.
+    """
+
+    def __init__(self, maxiter: int):
+        self.maxiter = maxiter
+        self.n = 0
+        self.orig = pr.integratetolist
+        self.getjit = pr.getjit
+
+    def __call__(self, *args):
+        self.n += 1
+        if self.n > self.maxiter:
+            raise _Maxiter()
+        return self.orig(*args)
+
+    def _getjit(self, backend=None):
+        if self.getjit(backend):
+            raise _Compiled()
+        return None
+
+    def __enter__(self):
+        pr.integratetolist = self
+        pr.getjit = self._getjit
+        return self
+
+    def __exit__(self, *exc):
+        pr.integratetolist = self.orig
+        pr.getjit = self.getjit
+
+
+def corpus(n: int = 12, maxv: float = 1000, pmin: float = 0.01, pmax: float = 300) -> np.ndarray:
+    """Regular grid of cases: n log spaced distances, n speeds from 0 to maxv for vin and vout.
+
+    Returns:
+        ndarray: (n**3, 3) array of (tp, vin, vout)
+    """
+    p = np.geomspace(pmin, pmax, n)
+    v = np.linspace(0, maxv, n)
+    return np.stack(np.meshgrid(p, v, v, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def run(planner, cases, j=100000, maxa=10000, maxv=1000, maxiter=100000, tol=(1e-3, 1e-2)) -> dict:
+    """Plans all cases and collects per case statistics.
+
+    Args:
+        planner (callable): Planner with plan5 signature
+        cases (ndarray): (N, 3) array of (tp, vin, vout)
+        maxiter (int, optional): Iteration limit of a case. Defaults to 100000.
+        tol (tuple, optional): End position and speed tolerances of OK class. Defaults to (1e-3, 1e-2).
+
+    Raises:
+        ValueError: If the planner solves with the numba backend
+
+    Returns:
+        dict: (N,) arrays: status, iters, time, perr, verr
+    """
+    n = len(cases)
+    res = {
+        "status": np.zeros(n, np.int8),
+        "iters": np.zeros(n, np.int64),
+        "time": np.zeros(n, float),
+        "perr": np.full(n, np.nan),
+        "verr": np.full(n, np.nan),
+    }
+    js = np.array((1, 0, -1, 0, -1, 0, 1), float) * j
+    orig = pr.integratetolist
+    for i, (tp, vin, vout) in enumerate(cases.tolist()):
+        with counter(maxiter) as c:
+            s = perf_counter()
+            try:
+                ts = planner(j, maxa, maxv, tp, vin, vout)
+                st = OK
+            except pr.PathtoshortError:
+                st = TOSHORT
+            except pr.NoconvergenceError:
+                st = NOCONVERGENCE
+            except _Maxiter:
+                st = MAXITER
+            except _Compiled:
+                raise ValueError("Iterations of numba backend solves can't be counted, use the python backend") from None
+            except ValueError as e:
+                st = OVERSPEED if "must be smaller" in str(e) else ERROR
+            except Exception:
+                st = ERROR
+            res["time"][i] = perf_counter() - s
+        res["iters"][i] = c.n
+        if st == OK:
+            avps = orig(np.asarray(ts, float), js, vin)
+            res["perr"][i] = abs(avps[7, 2] - tp)
+            res["verr"][i] = abs(avps[7, 1] - vout)
+            if not (res["perr"][i] <= tol[0] and res["verr"][i] <= tol[1] and (np.asarray(ts) >= 0).all()):
+                st = INACCURATE
+        res["status"][i] = st
+    return res
+
+
+def heatmap(cases, fail, axes=(1, 2), bins=8) -> np.ndarray:
+    """Failure rate over two of (tp, vin, vout) axes, distances are binned in log scale"""
+    x = [np.log10(cases[:, k]) if k == 0 else cases[:, k] for k in axes]
+    total, ex, ey = np.histogram2d(*x, bins=bins)
+    failed, _, _ = np.histogram2d(*x, bins=(ex, ey), weights=fail.astype(float))
+    with np.errstate(invalid="ignore"):
+        return failed / total
+
+
+def report(cases, res, out=sys.stdout) -> dict:
+    """Prints and returns summary: class counts, percentiles of time and iterations, failure heatmaps"""
+    q = (50, 90, 99, 100)
+    st = res["status"]
+    ok = st == OK
+    fail = (st != OK) & (st != TOSHORT) & (st != OVERSPEED)  # Infeasible cases aren't failures
+    summary = {
+        "cases": len(st),
+        "classes": {name: int((st == k).sum()) for k, name in enumerate(CLASSES)},
+        "time_us": dict(zip(map(str, q), (np.percentile(res["time"], q) * 1e6).tolist())),
+        "iters": dict(zip(map(str, q), np.percentile(res["iters"], q).tolist())),
+        "perr_max": float(np.nanmax(res["perr"])) if ok.any() else None,
+        "verr_max": float(np.nanmax(res["verr"])) if ok.any() else None,
+        "heatmaps": {
+            "vin/vout": heatmap(cases, fail, (1, 2)).tolist(),
+            "tp/vin": heatmap(cases, fail, (0, 1)).tolist(),
+            "tp/vout": heatmap(cases, fail, (0, 2)).tolist(),
+        },
+    }
+    print(f"{summary['cases']} cases: " + ", ".join(f"{k} {v}" for k, v in summary["classes"].items() if v), file=out)
+    for name, unit in (("time_us", "us"), ("iters", "")):
+        print(f"{name:8} " + "  ".join(f"p{k} {v:10.1f}{unit}" for k, v in summary[name].items()), file=out)
+    print(f"max errors of ok cases: position {summary['perr_max']}, speed {summary['verr_max']}", file=out)
+    for name, h in summary["heatmaps"].items():
+        print(f"\nFailure rate, {name} (rows: first, log10 for tp; '.' none, '#' all, ' ' no cases):", file=out)
+        for row in h:
+            print(
+                "  " + "".join(" " if np.isnan(r) else "." if r == 0 else "#" if r == 1 else str(min(int(r * 10), 9)) for r in row),
+                file=out,
+            )
+    return summary
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--planner", default="plan5", choices=sorted(PLANNERS))
+    ap.add_argument("-n", type=int, default=12, help="grid points per axis")
+    ap.add_argument("--maxiter", type=int, default=100000)
+    ap.add_argument("-o", "--out", help="npz file to save cases and per case results to (and .json summary)")
+    ap.add_argument("--compare", help="npz file of an earlier run of the same corpus")
+    args = ap.parse_args(argv)
+
+    cases = corpus(args.n)
+    s = perf_counter()
+    try:
+        res = run(PLANNERS[args.planner], cases, maxiter=args.maxiter)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"{args.planner}: corpus run in {perf_counter() - s:.1f} s")
+    summary = report(cases, res)
+    if args.out:
+        np.savez_compressed(args.out, cases=cases, **res)
+        with open(args.out.removesuffix(".npz") + ".json", "w") as f:
+            json.dump({"planner": args.planner, **summary}, f, indent=1)
+    if args.compare:
+        base = np.load(args.compare)
+        if not np.array_equal(base["cases"], cases):
+            print("Corpora differ, cases can't be compared")
+            return 1
+        worse = np.flatnonzero((base["status"] == OK) & (res["status"] != OK))
+        print(f"\n{len(worse)} cases not ok any more")
+        for i in worse[:20].tolist():
+            print(f"  tp={cases[i, 0]:.4g} vin={cases[i, 1]:.4g} vout={cases[i, 2]:.4g}: {CLASSES[res['status'][i]]}")
+        ratio = np.median(res["iters"][res["status"] == OK]) / max(np.median(base["iters"][base["status"] == OK]), 1)
+        print(f"median iterations of ok cases: {ratio:.2f}x")
+        return 1 if len(worse) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())